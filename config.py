@@ -2,35 +2,88 @@
 Configuration settings for the IgnorantStrength tweet generator.
 """
 
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file. The dotenv import itself is
+# deferred and the load guarded so repeated interpreter startups (e.g. under
+# systemd/docker where the env is already populated) only pay it once.
+if not os.environ.get("DOTENV_LOADED"):
+    from dotenv import load_dotenv
+    load_dotenv()
+    os.environ["DOTENV_LOADED"] = "1"
 
+# Snapshot the env vars we care about once at import time so each Config()
+# reads from a plain dict instead of hitting os.environ repeatedly
+_ENV_KEYS = (
+    "AI_PROVIDER",
+    "OPENAI_API_KEY",
+    "GEMINI_API_KEY",
+    "TWITTER_CLIENT_ID",
+    "TWITTER_CLIENT_SECRET",
+    "TWITTER_BEARER_TOKEN",
+    "TWITTER_API_KEY",
+    "TWITTER_API_SECRET",
+    "TWITTER_ACCESS_TOKEN",
+    "TWITTER_ACCESS_TOKEN_SECRET",
+    "AUTO_POST",
+    "STORY_CACHE_ENABLED",
+)
+_ENV = {key: os.environ.get(key) for key in _ENV_KEYS}
+
+# Directories already created this process (avoids repeat mkdir syscalls)
+_dirs_made = set()
+
+
+@dataclass(frozen=True, slots=True)
+class BaseConfig:
+    """Shared env-var backed settings (API keys and credentials).
+
+    Themed configs subclass this so the env-var fields and credential
+    validation are defined (and parsed) in exactly one place.
+    """
 
-@dataclass
-class Config:
-    """Configuration class for all settings."""
-    
     # AI Provider Settings (OpenAI or Gemini)
-    ai_provider: str = os.getenv("AI_PROVIDER", "openai")  # "openai" or "gemini"
-    openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
-    gemini_api_key: Optional[str] = os.getenv("GEMINI_API_KEY")
-    
+    ai_provider: str = field(default_factory=lambda: _ENV["AI_PROVIDER"] or "openai")  # "openai" or "gemini"
+    openai_api_key: Optional[str] = field(default_factory=lambda: _ENV["OPENAI_API_KEY"])
+    gemini_api_key: Optional[str] = field(default_factory=lambda: _ENV["GEMINI_API_KEY"])
+
     # Twitter/X API Settings (OAuth 2.0)
-    twitter_client_id: Optional[str] = os.getenv("TWITTER_CLIENT_ID")
-    twitter_client_secret: Optional[str] = os.getenv("TWITTER_CLIENT_SECRET")
-    twitter_bearer_token: Optional[str] = os.getenv("TWITTER_BEARER_TOKEN")
-    
+    twitter_client_id: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_CLIENT_ID"])
+    twitter_client_secret: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_CLIENT_SECRET"])
+    twitter_bearer_token: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_BEARER_TOKEN"])
+
     # Legacy OAuth 1.0a (for media upload fallback)
-    twitter_api_key: Optional[str] = os.getenv("TWITTER_API_KEY")
-    twitter_api_secret: Optional[str] = os.getenv("TWITTER_API_SECRET")
-    twitter_access_token: Optional[str] = os.getenv("TWITTER_ACCESS_TOKEN")
-    twitter_access_token_secret: Optional[str] = os.getenv("TWITTER_ACCESS_TOKEN_SECRET")
-    
+    twitter_api_key: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_API_KEY"])
+    twitter_api_secret: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_API_SECRET"])
+    twitter_access_token: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_ACCESS_TOKEN"])
+    twitter_access_token_secret: Optional[str] = field(default_factory=lambda: _ENV["TWITTER_ACCESS_TOKEN_SECRET"])
+
+    # Posting Settings
+    auto_post: bool = field(default_factory=lambda: (_ENV["AUTO_POST"] or "false").lower() == "true")
+
+    def __post_init__(self):
+        """Validate required API keys and posting credentials."""
+        if self.ai_provider == "openai" and not self.openai_api_key:
+            raise ValueError("OpenAI API key is required when using OpenAI provider")
+
+        if self.ai_provider == "gemini" and not self.gemini_api_key:
+            raise ValueError("Gemini API key is required when using Gemini provider")
+
+        if self.auto_post and not (
+            (self.twitter_client_id and self.twitter_client_secret) or
+            (self.twitter_api_key and self.twitter_api_secret and
+             self.twitter_access_token and self.twitter_access_token_secret)
+        ):
+            raise ValueError("Twitter API credentials are required for auto-posting (either OAuth 2.0 Client ID/Secret or OAuth 1.0a keys)")
+
+
+@dataclass(frozen=True, slots=True)
+class Config(BaseConfig):
+    """Configuration for the random-stories account theme."""
+
     # Content Generation Settings
     account_theme: str = "random stories"
     account_description: str = """
@@ -45,6 +98,10 @@ class Config:
     story_max_length: int = 800  # Allow longer stories for better threading
     story_temperature: float = 0.9  # Higher creativity for stories
     use_threads: bool = True  # Enable Twitter threads for longer stories
+    # Dev-mode switch: reuse results for identical prompts. Only honored
+    # at temperature 0, where regenerating is pure waste; at creative
+    # temperatures a cache would pin one story per topic.
+    story_cache_enabled: bool = field(default_factory=lambda: (_ENV["STORY_CACHE_ENABLED"] or "false").lower() == "true")
     thread_max_length: int = 270  # Characters per tweet in thread (optimized for Twitter)
     
     # Image Generation Settings
@@ -52,36 +109,29 @@ class Config:
     image_size: str = "1024x1024"
     image_style: str = "minimalist, inspirational"
     image_output_dir: str = "generated_images"
-    
+
     # Posting Settings
-    auto_post: bool = os.getenv("AUTO_POST", "false").lower() == "true"
     posts_per_day: int = 2  # For batch generation (twice daily)
-    
+
     # Scheduling Settings - Twice daily (12-hour intervals)
     post_times: list = None  # Will be set in __post_init__
-    
+
     def __post_init__(self):
         """Set default post times if not provided."""
         if self.post_times is None:
-            self.post_times = ["08:00", "20:00"]  # 8 AM, 8 PM (twice daily, 12-hour intervals)
-        
-        # Create image output directory if it doesn't exist
-        os.makedirs(self.image_output_dir, exist_ok=True)
-        
-        # Validate required API keys
-        if self.ai_provider == "openai" and not self.openai_api_key:
-            raise ValueError("OpenAI API key is required when using OpenAI provider")
-        
-        if self.ai_provider == "gemini" and not self.gemini_api_key:
-            raise ValueError("Gemini API key is required when using Gemini provider")
-        
-        if self.auto_post and not (
-            (self.twitter_client_id and self.twitter_client_secret) or
-            (self.twitter_api_key and self.twitter_api_secret and 
-             self.twitter_access_token and self.twitter_access_token_secret)
-        ):
-            raise ValueError("Twitter API credentials are required for auto-posting (either OAuth 2.0 Client ID/Secret or OAuth 1.0a keys)")
-    
+            # 8 AM, 8 PM (twice daily, 12-hour intervals)
+            object.__setattr__(self, 'post_times', ["08:00", "20:00"])
+
+        # Create the image output directory once per unique path per
+        # process; os.makedirs(exist_ok=True) still costs a syscall
+        if self.image_output_dir not in _dirs_made:
+            os.makedirs(self.image_output_dir, exist_ok=True)
+            _dirs_made.add(self.image_output_dir)
+
+        # Explicit base call: zero-arg super() loses its class cell when
+        # dataclass(slots=True) rebuilds the class
+        BaseConfig.__post_init__(self)
+
     @property
     def story_prompt_template(self) -> str:
         """Template for generating short stories."""
@@ -149,6 +199,12 @@ class Config:
         - Capture the emotional tone of the story
         - Be suitable for Twitter/X posting
         - Avoid including readable text in the image
-        
+
         Style: {style}
-        """
\ No newline at end of file
+        """
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the shared Config instance, creating it on first use."""
+    return Config()
\ No newline at end of file
@@ -10,7 +10,7 @@ import logging
 from datetime import datetime
 from typing import Dict
 
-from config import Config
+from config import get_config
 from crypto_predictor import CryptoPredictor
 from image_generator import ImageGenerator
 from twitter_poster import TwitterPoster
@@ -31,7 +31,7 @@ class CryptoTweetGenerator:
     """Main class for generating and posting crypto prediction tweets."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.crypto_predictor = CryptoPredictor(self.config)
         self.image_gen = ImageGenerator(self.config)
         self.twitter = TwitterPoster(self.config)
@@ -43,26 +43,28 @@ class CryptoTweetGenerator:
         try:
             # Generate crypto prediction
             prediction = self.crypto_predictor.generate_prediction()
-            logger.info(f"Generated prediction: {prediction[:50]}...")
+            logger.info("Generated prediction: %.50s...", prediction)
             
-            # Generate image based on the prediction
+            # Generate image based on the prediction (one datetime.now()
+            # shared by the filename and the timestamp)
+            now = datetime.now()
             image_path = self.image_gen.generate_image(
-                prediction, 
-                f"crypto_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                prediction,
+                f"crypto_{now.strftime('%Y%m%d_%H%M%S')}"
             )
-            logger.info(f"Generated image: {image_path}")
-            
+            logger.info("Generated image: %s", image_path)
+
             post = {
                 'prediction': prediction,
                 'image_path': image_path,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             }
             
             logger.info("Successfully generated crypto prediction post")
             return post
             
         except Exception as e:
-            logger.error(f"Error generating crypto post: {str(e)}")
+            logger.error("Error generating crypto post: %s", e)
             raise
     
     def post_to_twitter(self, post: Dict) -> None:
@@ -75,10 +77,10 @@ class CryptoTweetGenerator:
                 image_path=post['image_path']
             )
             
-            logger.info(f"Successfully posted crypto prediction tweet ID: {tweet_id}")
+            logger.info("Successfully posted crypto prediction tweet ID: %s", tweet_id)
             
         except Exception as e:
-            logger.error(f"Error posting crypto tweet: {str(e)}")
+            logger.error("Error posting crypto tweet: %s", e)
             raise
     
     def run(self):
@@ -94,13 +96,13 @@ class CryptoTweetGenerator:
                 self.post_to_twitter(post)
             else:
                 logger.info("Auto-posting disabled. Prediction generated but not posted.")
-                logger.info(f"Prediction: {post['prediction']}")
-                logger.info(f"Image: {post['image_path']}")
+                logger.info("Prediction: %s", post['prediction'])
+                logger.info("Image: %s", post['image_path'])
             
             logger.info("=== Crypto prediction generation completed ===")
             
         except Exception as e:
-            logger.error(f"Critical error in crypto prediction execution: {str(e)}")
+            logger.error("Critical error in crypto prediction execution: %s", e)
             raise
 
 
@@ -3,232 +3,528 @@ Crypto price prediction module for generating engaging cryptocurrency prediction
 Picks trending coins and generates predictions with AI-generated reasoning.
 """
 
+import asyncio
 import logging
 import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Dict, List, Optional
-import requests
+import time
 from config import Config
 
+try:
+    # Optional - ~3x faster JSON parsing for the large CoinGecko payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional - stream-decodes /coins/{id} without building the full payload
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _parse_json(response):
+    """Decode a response body, preferring orjson when it's installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+# Prefixes of the only /coins/{id} fields the prediction text actually uses
+_COIN_DETAIL_PREFIXES = ('name', 'symbol', 'market_data.current_price.usd')
+
+# ijson's parse errors derive from Exception, not ValueError, so the
+# streaming branch needs them caught explicitly for a truncated or
+# non-JSON body to degrade to a fallback prediction
+_STREAM_PARSE_ERRORS = (ijson.JSONError,) if ijson is not None else ()
+
+
+def _extract_coin_fields(data: Dict) -> Dict:
+    """Reduce a full /coins/{id} payload to the three fields we use."""
+    usd = None
+    with suppress(KeyError, TypeError):
+        usd = data['market_data']['current_price']['usd']
+    return {
+        'name': data.get('name'),
+        'symbol': data.get('symbol'),
+        'market_data': {'current_price': {'usd': usd}}
+    }
+
+
+def _stream_coin_fields(raw) -> Dict:
+    """Stream-parse a /coins/{id} body, keeping only the fields we use.
+
+    Avoids materializing the ~200KB payload as Python objects; parsing
+    stops as soon as all three leaves have been seen.
+    """
+    found = {}
+    for prefix, _event, value in ijson.parse(raw):
+        if prefix in _COIN_DETAIL_PREFIXES:
+            found[prefix] = value
+            if len(found) == len(_COIN_DETAIL_PREFIXES):
+                break
+    return {
+        'name': found.get('name'),
+        'symbol': found.get('symbol'),
+        'market_data': {
+            'current_price': {'usd': found.get('market_data.current_price.usd')}
+        }
+    }
+
+# Shared session so repeated CoinGecko calls reuse keep-alive connections
+# instead of paying a TCP+TLS handshake per request. Created lazily so
+# one-shot invocations that never hit the API skip the requests/urllib3
+# import cost entirely.
+_session = None
+
+
+def _get_session():
+    """Return the shared HTTP session, creating it on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter, Retry
+
+        # Retry transient CoinGecko failures (it rate-limits aggressively)
+        # instead of burning the handshake and falling back to manual mode
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True
+        )
+        _session = requests.Session()
+        _session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        )
+    return _session
+
+
+def _get_httpx():
+    """Import httpx lazily; returns None when it isn't installed."""
+    try:
+        import httpx
+        return httpx
+    except ImportError:
+        return None
+
+# Simple TTL caches so batch generation doesn't hammer CoinGecko; trending
+# data only changes every minute or so upstream anyway
+_TRENDING_TTL = 300  # seconds
+_DETAILS_TTL = 600
+_trending_cache = {'expires': 0.0, 'coins': None}
+_details_cache = {}  # coin_id -> (expires, data)
+
+# Popular crypto coins to predict (symbol: name); read-only and shared by
+# every CryptoPredictor instance
+_CRYPTO_COINS = MappingProxyType({
+    'BTC': 'Bitcoin',
+    'ETH': 'Ethereum',
+    'BNB': 'Binance Coin',
+    'XRP': 'Ripple',
+    'ADA': 'Cardano',
+    'DOGE': 'Dogecoin',
+    'MATIC': 'Polygon',
+    'SOL': 'Solana',
+    'DOT': 'Polkadot',
+    'SHIB': 'Shiba Inu',
+    'AVAX': 'Avalanche',
+    'LINK': 'Chainlink',
+    'UNI': 'Uniswap',
+    'LTC': 'Litecoin',
+    'ATOM': 'Cosmos'
+})
+
+# Fallback predictions if API fails; a tuple so random.choice takes the
+# PyTuple fast path and nothing can mutate it
+_FALLBACK_PREDICTIONS = (
+    "🚀 Bitcoin could see a 15% surge next week as institutional adoption accelerates! The recent regulatory clarity might push BTC to new monthly highs. #Bitcoin #BTC #CryptoNews",
+    "📈 Ethereum looking bullish for next week! Smart contract upgrades and DeFi growth could drive ETH up 20%. Watch for the breakout above key resistance! #Ethereum #ETH #DeFi",
+    "⚡ Solana showing strong technical patterns! Could pump 25% next week with increased NFT activity and ecosystem growth. Don't sleep on SOL! #Solana #SOL #NFTs",
+    "🔥 Cardano (ADA) setup looks promising for next week. Ecosystem developments and partnerships could trigger a 18% rally. Perfect accumulation zone! #Cardano #ADA #Crypto",
+    "💎 Polygon (MATIC) ready to explode! Layer 2 adoption growing rapidly. Predicting 22% gains next week as more projects migrate. #Polygon #MATIC #Layer2"
+)
+
+# Reasoning pools and per-coin emojis, interned once at import instead of
+# being rebuilt inside every prediction call
+_REASONS_DATA = (
+    "strong technical breakout pattern forming",
+    "increased whale accumulation detected",
+    "major partnership announcements expected",
+    "ecosystem development accelerating",
+    "regulatory clarity improving sentiment",
+    "institutional adoption growing",
+    "network upgrade coming soon",
+    "DeFi integration expanding",
+    "NFT marketplace integration planned",
+    "cross-chain compatibility improving"
+)
+_REASONS_MANUAL = (
+    "technical analysis shows bullish patterns",
+    "whale accumulation increasing",
+    "ecosystem growth accelerating",
+    "partnership rumors circulating",
+    "network upgrades approaching",
+    "institutional interest growing",
+    "DeFi adoption expanding",
+    "market sentiment turning positive",
+    "key resistance levels breaking",
+    "trading volume surging"
+)
+_COIN_EMOJIS = {
+    'BTC': '₿', 'ETH': '⟐', 'BNB': '🟡', 'XRP': '💧', 'ADA': '🔷',
+    'DOGE': '🐕', 'MATIC': '🟣', 'SOL': '☀️', 'DOT': '⭕', 'SHIB': '🚀',
+    'AVAX': '🏔️', 'LINK': '🔗', 'UNI': '🦄', 'LTC': '🥈', 'ATOM': '⚛️'
+}
+
+# The emoji table must cover the closed coin list exactly so lookups can
+# index directly without a default
+assert _COIN_EMOJIS.keys() == _CRYPTO_COINS.keys()
+
+# Prediction text templates; the right one is picked up front from field
+# lengths so we never build an over-length tweet and rebuild it
+_DATA_TMPL_PRICE = (
+    "🚀 {name} ({symbol}) looking bullish for next week! Currently at {price}, "
+    "predicting {percent}% gains as {reason}. Perfect entry opportunity! "
+    "#{symbol} #Crypto #Prediction"
+)
+_DATA_TMPL = (
+    "🚀 {name} ({symbol}) looking bullish for next week! "
+    "predicting {percent}% gains as {reason}. Perfect entry opportunity! "
+    "#{symbol} #Crypto #Prediction"
+)
+_DATA_TMPL_SHORT = (
+    "🚀 {name} ({symbol}) could pump {percent}% next week! {reason}. "
+    "#{symbol} #Crypto #Prediction"
+)
+_EMPTY_FIELDS = {'name': '', 'symbol': '', 'price': '', 'percent': '', 'reason': ''}
+_DATA_TMPL_PRICE_LEN = len(_DATA_TMPL_PRICE.format_map(_EMPTY_FIELDS))
+_DATA_TMPL_LEN = len(_DATA_TMPL.format_map(_EMPTY_FIELDS))
+
+
 class CryptoPredictor:
     """Generates crypto price predictions for social media posts."""
     
     def __init__(self, config: Config):
         self.config = config
-        
-        # Popular crypto coins to predict (symbol: name)
-        self.crypto_coins = {
-            'BTC': 'Bitcoin',
-            'ETH': 'Ethereum', 
-            'BNB': 'Binance Coin',
-            'XRP': 'Ripple',
-            'ADA': 'Cardano',
-            'DOGE': 'Dogecoin',
-            'MATIC': 'Polygon',
-            'SOL': 'Solana',
-            'DOT': 'Polkadot',
-            'SHIB': 'Shiba Inu',
-            'AVAX': 'Avalanche',
-            'LINK': 'Chainlink',
-            'UNI': 'Uniswap',
-            'LTC': 'Litecoin',
-            'ATOM': 'Cosmos'
-        }
-        
-        # Fallback predictions if API fails
-        self.fallback_predictions = [
-            "🚀 Bitcoin could see a 15% surge next week as institutional adoption accelerates! The recent regulatory clarity might push BTC to new monthly highs. #Bitcoin #BTC #CryptoNews",
-            "📈 Ethereum looking bullish for next week! Smart contract upgrades and DeFi growth could drive ETH up 20%. Watch for the breakout above key resistance! #Ethereum #ETH #DeFi",
-            "⚡ Solana showing strong technical patterns! Could pump 25% next week with increased NFT activity and ecosystem growth. Don't sleep on SOL! #Solana #SOL #NFTs",
-            "🔥 Cardano (ADA) setup looks promising for next week. Ecosystem developments and partnerships could trigger a 18% rally. Perfect accumulation zone! #Cardano #ADA #Crypto",
-            "💎 Polygon (MATIC) ready to explode! Layer 2 adoption growing rapidly. Predicting 22% gains next week as more projects migrate. #Polygon #MATIC #Layer2"
-        ]
-    
+
+        # Shared module-level tables; kept as attributes for compatibility
+        self.crypto_coins = _CRYPTO_COINS
+        self.fallback_predictions = _FALLBACK_PREDICTIONS
+
+        # Precomputed sampling pool so per-call generation doesn't rebuild lists
+        self._symbols = tuple(self.crypto_coins)
+
     def generate_prediction(self) -> str:
         """Generate a crypto prediction post."""
         try:
             # Try to get real market data first
             coin_data = self._get_trending_coin()
-            
+
             if coin_data:
                 return self._create_prediction_with_data(coin_data)
             else:
                 # Fallback to manual prediction
                 return self._create_manual_prediction()
-                
-        except Exception as e:
-            logger.error(f"Error generating crypto prediction: {str(e)}")
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Error generating crypto prediction: %s", e)
             return random.choice(self.fallback_predictions)
     
-    def _get_trending_coin(self) -> Optional[Dict]:
-        """Get trending coin data from CoinGecko API (free tier)."""
+    def _trending_coins_raw(self) -> Optional[list]:
+        """Get the top trending coins list, cached for a few minutes."""
+        now = time.monotonic()
+        if _trending_cache['coins'] is not None and now < _trending_cache['expires']:
+            return _trending_cache['coins']
+
         try:
             # CoinGecko free API - get trending coins
             url = "https://api.coingecko.com/api/v3/search/trending"
-            response = requests.get(url, timeout=10)
-            
+            response = _get_session().get(url, timeout=10)
+
             if response.status_code == 200:
-                data = response.json()
-                
-                # Pick a random trending coin
+                data = _parse_json(response)
+
                 if data.get('coins') and len(data['coins']) > 0:
-                    trending_coin = random.choice(data['coins'][:7])  # Top 7 trending
-                    coin_info = trending_coin.get('item', {})
-                    
-                    # Get more details about this coin
-                    coin_id = coin_info.get('id')
-                    if coin_id:
-                        return self._get_coin_details(coin_id)
-            
+                    coins = data['coins'][:7]  # Top 7 trending
+                    _trending_cache['coins'] = coins
+                    _trending_cache['expires'] = now + _TRENDING_TTL
+                    return coins
+
             return None
-            
-        except Exception as e:
-            logger.warning(f"Error fetching trending coins: {str(e)}")
+
+        except (OSError, ValueError) as e:
+            logger.warning("Error fetching trending coins: %s", e)
             return None
-    
+
+    def _get_trending_coin(self) -> Optional[Dict]:
+        """Get trending coin data from CoinGecko API (free tier)."""
+        # Pick a random trending coin from the cached list
+        coins = self._trending_coins_raw()
+        if coins:
+            trending_coin = random.choice(coins)
+            coin_info = trending_coin.get('item', {})
+
+            # Get more details about this coin
+            coin_id = coin_info.get('id')
+            if coin_id:
+                return self._get_coin_details(coin_id)
+
+        return None
+
     def _get_coin_details(self, coin_id: str) -> Optional[Dict]:
-        """Get detailed coin information."""
+        """Get detailed coin information, cached per coin with a TTL."""
+        now = time.monotonic()
+        cached = _details_cache.get(coin_id)
+        if cached and now < cached[0]:
+            return cached[1]
+
         try:
             url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
-            response = requests.get(url, timeout=10)
-            
+
+            if ijson is not None:
+                # Stream-decode: pull only the three fields we use instead
+                # of materializing the whole ~200KB payload
+                response = _get_session().get(url, timeout=10, stream=True)
+                if response.status_code == 200:
+                    response.raw.decode_content = True
+                    data = _stream_coin_fields(response.raw)
+                else:
+                    data = None
+                response.close()
+            else:
+                response = _get_session().get(url, timeout=10)
+                if response.status_code == 200:
+                    data = _extract_coin_fields(_parse_json(response))
+                else:
+                    data = None
+
+            if data is not None:
+                _details_cache[coin_id] = (now + _DETAILS_TTL, data)
+
+            return data
+
+        except (OSError, ValueError) + _STREAM_PARSE_ERRORS as e:
+            logger.warning("Error fetching coin details for %s: %s", coin_id, e)
+            return None
+
+    async def _aget_trending_coin(self, client) -> Optional[Dict]:
+        """Async variant of _get_trending_coin using a shared httpx client."""
+        # httpx's network errors derive from httpx.HTTPError, not OSError,
+        # so they need their own entry for the fallback path to kick in
+        httpx = _get_httpx()
+        try:
+            now = time.monotonic()
+            coins = None
+            if _trending_cache['coins'] is not None and now < _trending_cache['expires']:
+                coins = _trending_cache['coins']
+            else:
+                url = "https://api.coingecko.com/api/v3/search/trending"
+                response = await client.get(url, timeout=10)
+
+                if response.status_code == 200:
+                    data = _parse_json(response)
+                    if data.get('coins') and len(data['coins']) > 0:
+                        coins = data['coins'][:7]  # Top 7 trending
+                        _trending_cache['coins'] = coins
+                        _trending_cache['expires'] = now + _TRENDING_TTL
+
+            if coins:
+                trending_coin = random.choice(coins)
+                coin_id = trending_coin.get('item', {}).get('id')
+                if coin_id:
+                    return await self._aget_coin_details(client, coin_id)
+
+            return None
+
+        except (OSError, ValueError, httpx.HTTPError) as e:
+            logger.warning("Error fetching trending coins: %s", e)
+            return None
+
+    async def _aget_coin_details(self, client, coin_id: str) -> Optional[Dict]:
+        """Async variant of _get_coin_details using a shared httpx client."""
+        now = time.monotonic()
+        cached = _details_cache.get(coin_id)
+        if cached and now < cached[0]:
+            return cached[1]
+
+        httpx = _get_httpx()
+        try:
+            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
+            response = await client.get(url, timeout=10)
+
             if response.status_code == 200:
-                return response.json()
-            
+                data = _extract_coin_fields(_parse_json(response))
+                _details_cache[coin_id] = (now + _DETAILS_TTL, data)
+                return data
+
             return None
-            
-        except Exception as e:
-            logger.warning(f"Error fetching coin details for {coin_id}: {str(e)}")
+
+        except (OSError, ValueError, httpx.HTTPError) as e:
+            logger.warning("Error fetching coin details for %s: %s", coin_id, e)
             return None
-    
+
+    async def _afetch_batch(self, count: int) -> List[Optional[Dict]]:
+        """Fetch market data for a whole batch concurrently on one client."""
+        async with _get_httpx().AsyncClient() as client:
+            return await asyncio.gather(
+                *[self._aget_trending_coin(client) for _ in range(count)]
+            )
+
     def _create_prediction_with_data(self, coin_data: Dict) -> str:
         """Create prediction using real coin data."""
         try:
             name = coin_data.get('name', 'Unknown')
             symbol = coin_data.get('symbol', '').upper()
             
-            # Get current price
+            # Get current price; any missing level in the payload just
+            # leaves current_price as None
             current_price = None
-            market_data = coin_data.get('market_data', {})
-            if market_data:
-                price_usd = market_data.get('current_price', {}).get('usd')
+            with suppress(KeyError, TypeError):
+                price_usd = coin_data['market_data']['current_price']['usd']
                 if price_usd:
                     current_price = float(price_usd)
             
             # Generate prediction percentage (5% to 35%)
             prediction_percent = random.randint(5, 35)
-            
+
             # Generate reasoning
-            reasons = [
-                "strong technical breakout pattern forming",
-                "increased whale accumulation detected",
-                "major partnership announcements expected", 
-                "ecosystem development accelerating",
-                "regulatory clarity improving sentiment",
-                "institutional adoption growing",
-                "network upgrade coming soon",
-                "DeFi integration expanding",
-                "NFT marketplace integration planned",
-                "cross-chain compatibility improving"
-            ]
-            
-            reason = random.choice(reasons)
+            reason = random.choice(_REASONS_DATA)
             
             # Create prediction text
             if current_price and current_price > 0.01:
                 price_str = f"${current_price:.2f}" if current_price < 100 else f"${current_price:,.0f}"
             else:
                 price_str = ""
-            
-            prediction_text = f"🚀 {name} ({symbol}) looking bullish for next week! "
-            
+
+            percent_str = str(prediction_percent)
             if price_str:
-                prediction_text += f"Currently at {price_str}, "
-            
-            prediction_text += f"predicting {prediction_percent}% gains as {reason}. "
-            prediction_text += f"Perfect entry opportunity! #{symbol} #Crypto #Prediction"
-            
-            # Ensure it's not too long
-            if len(prediction_text) > 270:
-                prediction_text = f"🚀 {name} ({symbol}) could pump {prediction_percent}% next week! {reason.capitalize()}. #{symbol} #Crypto #Prediction"
+                template, static_len = _DATA_TMPL_PRICE, _DATA_TMPL_PRICE_LEN
+            else:
+                template, static_len = _DATA_TMPL, _DATA_TMPL_LEN
+
+            # Pick the short template up front if the long one would run over
+            # the tweet limit ({symbol} appears twice: header and hashtag)
+            est_len = (static_len + len(name) + 2 * len(symbol) + len(price_str)
+                       + len(percent_str) + len(reason))
+            if est_len > 270:
+                prediction_text = _DATA_TMPL_SHORT.format_map({
+                    'name': name, 'symbol': symbol, 'percent': percent_str,
+                    'reason': reason.capitalize()
+                })
+            else:
+                prediction_text = template.format_map({
+                    'name': name, 'symbol': symbol, 'price': price_str,
+                    'percent': percent_str, 'reason': reason
+                })
             
-            logger.info(f"Generated prediction for {name} ({symbol}): {prediction_percent}% gain")
+            logger.info("Generated prediction for %s (%s): %s%% gain", name, symbol, prediction_percent)
             return prediction_text
             
-        except Exception as e:
-            logger.error(f"Error creating prediction with data: {str(e)}")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("Error creating prediction with data: %s", e)
             return self._create_manual_prediction()
     
-    def _create_manual_prediction(self) -> str:
-        """Create prediction using manual coin list."""
+    def _create_manual_prediction(self, symbol: Optional[str] = None,
+                                  prediction_percent: Optional[int] = None,
+                                  reason: Optional[str] = None) -> str:
+        """Create prediction using manual coin list.
+
+        The random picks can be supplied by callers (e.g. batch generation)
+        that pre-draw them in bulk.
+        """
         try:
             # Pick random coin from our list
-            symbol = random.choice(list(self.crypto_coins.keys()))
+            if symbol is None:
+                symbol = random.choice(self._symbols)
             name = self.crypto_coins[symbol]
-            
+
             # Generate prediction percentage (8% to 30%)
-            prediction_percent = random.randint(8, 30)
-            
+            if prediction_percent is None:
+                prediction_percent = random.randint(8, 30)
+
             # Generate reasoning
-            reasons = [
-                "technical analysis shows bullish patterns",
-                "whale accumulation increasing",
-                "ecosystem growth accelerating", 
-                "partnership rumors circulating",
-                "network upgrades approaching",
-                "institutional interest growing",
-                "DeFi adoption expanding",
-                "market sentiment turning positive",
-                "key resistance levels breaking",
-                "trading volume surging"
-            ]
-            
-            reason = random.choice(reasons)
+            if reason is None:
+                reason = random.choice(_REASONS_MANUAL)
             
-            # Emojis for different coins
-            coin_emojis = {
-                'BTC': '₿', 'ETH': '⟐', 'BNB': '🟡', 'XRP': '💧', 'ADA': '🔷',
-                'DOGE': '🐕', 'MATIC': '🟣', 'SOL': '☀️', 'DOT': '⭕', 'SHIB': '🚀',
-                'AVAX': '🏔️', 'LINK': '🔗', 'UNI': '🦄', 'LTC': '🥈', 'ATOM': '⚛️'
-            }
+            # Direct index: symbol always comes from the closed coin list
+            emoji = _COIN_EMOJIS[symbol]
             
-            emoji = coin_emojis.get(symbol, '🚀')
+            # Single join instead of repeated += so the text is built in
+            # one final allocation
+            prediction_text = "".join((
+                f"{emoji} {name} ({symbol}) prediction: {prediction_percent}% pump next week! ",
+                f"{reason.capitalize()}. Great accumulation opportunity! ",
+                f"#{symbol} #Crypto #Prediction"
+            ))
             
-            prediction_text = f"{emoji} {name} ({symbol}) prediction: {prediction_percent}% pump next week! "
-            prediction_text += f"{reason.capitalize()}. Great accumulation opportunity! "
-            prediction_text += f"#{symbol} #Crypto #Prediction"
-            
-            logger.info(f"Generated manual prediction for {name} ({symbol}): {prediction_percent}% gain")
+            logger.info("Generated manual prediction for %s (%s): %s%% gain", name, symbol, prediction_percent)
             return prediction_text
             
-        except Exception as e:
-            logger.error(f"Error creating manual prediction: {str(e)}")
+        except (KeyError, TypeError) as e:
+            logger.error("Error creating manual prediction: %s", e)
             return random.choice(self.fallback_predictions)
     
     def generate_batch_predictions(self, count: int = 1) -> List[str]:
         """Generate multiple predictions."""
         predictions = []
-        
+
+        # Pre-draw all random picks in bulk so the manual fallback path
+        # doesn't pay per-call sampling overhead inside the loop
+        symbols = random.choices(self._symbols, k=count)
+        percents = random.choices(range(8, 31), k=count)
+        reasons = random.choices(_REASONS_MANUAL, k=count)
+
+        # Fetch market data for the whole batch concurrently; requests
+        # releases the GIL during socket I/O so the calls overlap
+        coin_data_batch = None
+        if count > 1 and _get_httpx() is not None:
+            try:
+                coin_data_batch = asyncio.run(self._afetch_batch(count))
+            except Exception as e:
+                # A batch fetch failure must degrade to the sync path,
+                # not take the whole batch down with it
+                logger.warning("Async batch fetch failed, using thread pool: %s", e)
+
+        if coin_data_batch is None:
+            if count > 1:
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    coin_data_batch = list(
+                        executor.map(lambda _: self._get_trending_coin(), range(count))
+                    )
+            else:
+                coin_data_batch = [self._get_trending_coin() for _ in range(count)]
+
         for i in range(count):
             try:
-                prediction = self.generate_prediction()
+                coin_data = coin_data_batch[i]
+                if coin_data:
+                    prediction = self._create_prediction_with_data(coin_data)
+                else:
+                    prediction = self._create_manual_prediction(
+                        symbols[i], percents[i], reasons[i]
+                    )
                 predictions.append(prediction)
-                logger.info(f"Generated crypto prediction {i+1}/{count}")
+                logger.info("Generated crypto prediction %d/%d", i + 1, count)
             except Exception as e:
-                logger.error(f"Error generating prediction {i+1}: {str(e)}")
+                logger.error("Error generating prediction %d: %s", i + 1, e)
                 predictions.append(random.choice(self.fallback_predictions))
-        
+
         return predictions
 
 
 # Test function
 if __name__ == "__main__":
-    from config import Config
+    from config import get_config
     
-    config = Config()
+    config = get_config()
     predictor = CryptoPredictor(config)
     
     print("Testing crypto prediction generation:")
@@ -3,20 +3,48 @@ Image generation module supporting both OpenAI DALL-E and other AI models.
 Creates inspirational images based on generated quotes.
 """
 
+import functools
+import hashlib
 import logging
 import os
-import requests
-from datetime import datetime
-from typing import Optional
-import openai
-import google.generativeai as genai
-from google.genai import types
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
-from io import BytesIO
+import re
+import shutil
+import time
+
+# The AI SDKs, Pillow and requests are imported lazily inside the methods
+# that need them: importing this module (and the text-only or DALL-E-only
+# paths) no longer pays for the unused stacks at cold start
 
 logger = logging.getLogger(__name__)
 
+# Hashtag stripping runs on every image; compiled once so the scan happens
+# in C instead of a Python per-word startswith loop. Anchored to token
+# starts and spanning the whole token, matching the old whitespace-split
+# behavior: "#Fun!" goes entirely, "a#b" stays intact
+_HASHTAG_RE = re.compile(r'(?:(?<=\s)|^)#\S+')
+_HASHTAG_LINE_RE = re.compile(r'(?m)^\s*#.*$')
+
+# Upper bound for the on-disk DALL-E image cache
+_IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=128)
+def _clean_story_for_prompt(story: str) -> str:
+    """Clean a story for use in image generation prompts.
+
+    Deterministic on the input string, so results are memoized — the same
+    story gets cleaned for the prompt and again inside generation.
+    """
+    # Drop hashtag-only lines, then inline hashtags, then normalize whitespace
+    clean_story = _HASHTAG_LINE_RE.sub('', story)
+    return ' '.join(_HASHTAG_RE.sub('', clean_story).split())
+
+
+@functools.lru_cache(maxsize=128)
+def _clean_story_for_display(story: str) -> str:
+    """Clean a story for display on an image (memoized)."""
+    return ' '.join(_HASHTAG_RE.sub('', story).split())
+
 
 class ImageGenerator:
     """Generates images for quotes using AI models."""
@@ -24,13 +52,88 @@ class ImageGenerator:
     def __init__(self, config):
         self.config = config
         self._setup_ai_client()
-    
+
+        # Built lazily by _get_http on the first image download
+        self._http = None
+
+        # Fallback-image assets (font, overlay, canvas); built lazily by
+        # _init_text_image_assets on the first fallback render so the
+        # DALL-E-only path never imports Pillow
+        self._font_size = 48
+        self._font = None
+        self._decor_overlay = None
+        self._canvas_template = None
+
+    def _get_http(self):
+        """Create the pooled download session on first use.
+
+        Pooling lets repeated image downloads reuse the TLS connection to
+        the CDN instead of paying a fresh handshake per image.
+        """
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter, Retry
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(total=3, backoff_factor=0.3,
+                                  status_forcelist=[429, 500, 502, 503, 504])
+            ))
+            self._http = session
+        return self._http
+
+    def _init_text_image_assets(self):
+        """Build the reusable fallback-image assets on first use."""
+        from PIL import Image
+
+        # Parsing the TTF from disk is slow; load it once and reuse it
+        # across fallback images
+        self._font = self._load_font(self._font_size)
+
+        # The decorations are fixed geometry, so render them once as an
+        # RGBA overlay and paste it per image instead of issuing six
+        # rectangle calls per fallback image
+        self._decor_overlay = self._build_decor_overlay(1080, 1080)
+
+        # Pre-filled background canvas; each fallback image starts from a
+        # straight memcpy of this instead of allocating and filling anew
+        self._canvas_template = Image.new('RGB', (1080, 1080), (25, 35, 50))
+
+    def _load_font(self, font_size: int):
+        """Load the display font, falling back to Pillow's default."""
+        from PIL import ImageFont
+
+        try:
+            return ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
+        except:
+            try:
+                return ImageFont.truetype("arial.ttf", font_size)
+            except:
+                return ImageFont.load_default()
+
+    def close(self):
+        """Release the pooled HTTP session, if one was created."""
+        if self._http is not None:
+            self._http.close()
+
     def _setup_ai_client(self):
         """Initialize the AI client based on the configured provider."""
-        if self.config.ai_provider == "openai":
-            openai.api_key = self.config.openai_api_key
-        elif self.config.ai_provider == "gemini":
+        # One client for all DALL-E calls so its httpx pool keeps the
+        # connection to api.openai.com alive between images
+        self._openai_client = None
+        if self.config.openai_api_key:
+            import openai
+
+            if self.config.ai_provider == "openai":
+                openai.api_key = self.config.openai_api_key
+            self._openai_client = openai.OpenAI(api_key=self.config.openai_api_key)
+
+        if self.config.ai_provider == "gemini":
             if self.config.gemini_api_key:
+                import google.generativeai as genai
+
                 genai.configure(api_key=self.config.gemini_api_key)
                 # Use the new Google GenAI client for image generation
                 from google import genai as google_genai
@@ -58,35 +161,37 @@ class ImageGenerator:
     
     def _clean_story_for_prompt(self, story: str) -> str:
         """Clean the story for use in image generation prompts."""
-        # Remove hashtags and extra whitespace
-        lines = story.split('\n')
-        clean_lines = []
-        
-        for line in lines:
-            if not line.strip().startswith('#'):
-                clean_lines.append(line.strip())
-        
-        clean_story = ' '.join(clean_lines).strip()
-        
-        # Remove hashtags that might be at the end
-        words = clean_story.split()
-        filtered_words = [word for word in words if not word.startswith('#')]
-        
-        return ' '.join(filtered_words)
+        return _clean_story_for_prompt(story)
     
     def _generate_with_dalle(self, story: str, filename_prefix: str) -> str:
         """Generate image using OpenAI DALL-E."""
         try:
-            client = openai.OpenAI(api_key=self.config.openai_api_key)
-            
+            client = self._openai_client
+
             # Create image prompt
             image_prompt = self.config.image_prompt_template.format(
                 story=story,
                 style=self.config.image_style
             )
             
+            filename = f"{filename_prefix}_{time.monotonic_ns()}.png"
+            filepath = os.path.join(self.config.image_output_dir, filename)
+
+            # Reruns and retries often repeat the exact prompt; serve those
+            # from the local disk cache instead of re-paying the API call
+            cache_key = hashlib.sha256(
+                (image_prompt + self.config.image_model + self.config.image_size).encode()
+            ).hexdigest()
+            cache_dir = os.path.join(self.config.image_output_dir, '.cache')
+            cache_path = os.path.join(cache_dir, f"{cache_key}.png")
+
+            if os.path.exists(cache_path):
+                shutil.copy(cache_path, filepath)
+                logger.info(f"Reused cached DALL-E image: {filepath}")
+                return filepath
+
             logger.info(f"Generating image with DALL-E for story: {story[:50]}...")
-            
+
             response = client.images.generate(
                 model=self.config.image_model,
                 prompt=image_prompt,
@@ -94,15 +199,16 @@ class ImageGenerator:
                 quality="standard",
                 n=1
             )
-            
+
             image_url = response.data[0].url
-            
-            # Download and save the image
-            filename = f"{filename_prefix}_{datetime.now().strftime('%H%M%S')}.png"
-            filepath = os.path.join(self.config.image_output_dir, filename)
-            
+
+            # Download and save the image, then add it to the cache
             self._download_image(image_url, filepath)
-            
+
+            os.makedirs(cache_dir, exist_ok=True)
+            shutil.copy(filepath, cache_path)
+            self._prune_image_cache(cache_dir)
+
             logger.info(f"Successfully generated image: {filepath}")
             return filepath
             
@@ -113,6 +219,8 @@ class ImageGenerator:
     def _generate_with_gemini(self, story: str, filename_prefix: str) -> str:
         """Generate image using Gemini 2.5 Flash image generation."""
         try:
+            from google.genai import types
+
             # Create image prompt
             image_prompt = self.config.image_prompt_template.format(
                 story=story,
@@ -141,12 +249,13 @@ class ImageGenerator:
                 raise Exception("No image data returned from Gemini")
             
             # Save the image
-            filename = f"{filename_prefix}_{datetime.now().strftime('%H%M%S')}.png"
+            filename = f"{filename_prefix}_{time.monotonic_ns()}.png"
             filepath = os.path.join(self.config.image_output_dir, filename)
             
-            # Convert bytes to PIL Image and save
-            image = Image.open(BytesIO(image_data))
-            image.save(filepath, 'PNG')
+            # The API already returns encoded PNG bytes; write them as-is
+            # instead of decoding and re-encoding through PIL
+            with open(filepath, 'wb') as f:
+                f.write(image_data)
             
             logger.info(f"Successfully generated image with Gemini: {filepath}")
             return filepath
@@ -155,64 +264,91 @@ class ImageGenerator:
             logger.error(f"Gemini image generation error: {str(e)}")
             raise
     
+    def _prune_image_cache(self, cache_dir: str) -> None:
+        """Keep the image cache under its size bound, evicting oldest first."""
+        try:
+            entries = []
+            total_size = 0
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+
+            if total_size <= _IMAGE_CACHE_MAX_BYTES:
+                return
+
+            for _, size, path in sorted(entries):
+                os.remove(path)
+                total_size -= size
+                if total_size <= _IMAGE_CACHE_MAX_BYTES:
+                    break
+        except OSError as e:
+            logger.warning(f"Could not prune image cache: {e}")
+
     def _download_image(self, url: str, filepath: str) -> None:
-        """Download image from URL and save to file."""
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        """Download image from URL and stream it to file."""
+        with self._get_http().get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+
+            with open(filepath, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=65536)
     
     def _generate_text_image(self, story: str, filename_prefix: str) -> str:
         """Generate a simple text-based image as fallback."""
         try:
+            from PIL import ImageDraw
+
+            if self._canvas_template is None:
+                self._init_text_image_assets()
+
             # Create image dimensions
             width, height = 1080, 1080
-            background_color = (25, 35, 50)  # Dark navy for stories
             text_color = (255, 255, 255)  # White
-            
-            # Create image
-            image = Image.new('RGB', (width, height), background_color)
+
+            # Start from the pre-filled dark navy template
+            image = self._canvas_template.copy()
             draw = ImageDraw.Draw(image)
-            
+
             # Clean story for display (remove hashtags)
             display_story = self._clean_story_for_display(story)
-            
-            # Try to load a font, fallback to default if not available
-            try:
-                font_size = 48
-                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except:
-                    font = ImageFont.load_default()
+
+            # Use the cached font and size
+            font_size = self._font_size
+            font = self._font
             
             # Wrap text to fit image
             margin = 100
             max_width = width - (margin * 2)
             
-            # Simple text wrapping
+            # Simple text wrapping; measure each word once and accumulate
+            # widths arithmetically instead of re-measuring the whole line
+            # per candidate word (which is O(n^2) in the story length)
             words = display_story.split()
+            word_widths = [font.getlength(word) for word in words]
+            space_width = font.getlength(' ')
+
             lines = []
-            current_line = []
-            
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=font)
-                text_width = bbox[2] - bbox[0]
-                
-                if text_width <= max_width:
-                    current_line.append(word)
+            current_line = ''
+            current_width = 0.0
+
+            for word, word_width in zip(words, word_widths):
+                added_width = (space_width + word_width) if current_line else word_width
+
+                if current_width + added_width <= max_width:
+                    current_line = (current_line + ' ' + word) if current_line else word
+                    current_width += added_width
                 else:
                     if current_line:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
+                        lines.append(current_line)
+                        current_line = word
+                        current_width = word_width
                     else:
                         lines.append(word)  # Single word too long
-            
+
             if current_line:
-                lines.append(' '.join(current_line))
+                lines.append(current_line)
             
             # Calculate text height and position
             total_text_height = len(lines) * font_size * 1.2
@@ -227,14 +363,16 @@ class ImageGenerator:
                 
                 draw.text((x, y), line, font=font, fill=text_color)
             
-            # Add decorative elements
-            self._add_decorative_elements(draw, width, height)
+            # Add decorative elements (single blit of the prebuilt overlay)
+            image.paste(self._decor_overlay, (0, 0), self._decor_overlay)
             
             # Save image
-            filename = f"{filename_prefix}_text_{datetime.now().strftime('%H%M%S')}.png"
+            filename = f"{filename_prefix}_text_{time.monotonic_ns()}.png"
             filepath = os.path.join(self.config.image_output_dir, filename)
-            
-            image.save(filepath, 'PNG')
+
+            # Low zlib level: the flat background compresses to nearly the
+            # same size as the default level at a fraction of the CPU cost
+            image.save(filepath, 'PNG', compress_level=1, optimize=False)
             
             logger.info(f"Generated text-based image: {filepath}")
             return filepath
@@ -245,25 +383,27 @@ class ImageGenerator:
     
     def _clean_story_for_display(self, story: str) -> str:
         """Clean story for display on image."""
-        # Remove hashtags
-        words = story.split()
-        filtered_words = [word for word in words if not word.startswith('#')]
-        return ' '.join(filtered_words).strip()
+        return _clean_story_for_display(story)
     
-    def _add_decorative_elements(self, draw: ImageDraw.Draw, width: int, height: int):
-        """Add simple decorative elements to the image."""
+    def _build_decor_overlay(self, width: int, height: int):
+        """Render the static decorative elements once as an RGBA overlay."""
+        from PIL import Image, ImageDraw
+
+        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+
         # Add a subtle border
-        border_color = (100, 110, 130)
+        border_color = (100, 110, 130, 255)
         border_width = 3
-        
+
         # Top and bottom borders
         draw.rectangle([50, 50, width-50, 50+border_width], fill=border_color)
         draw.rectangle([50, height-50-border_width, width-50, height-50], fill=border_color)
-        
+
         # Corner decorations
         corner_size = 20
-        corner_color = (150, 160, 180)
-        
+        corner_color = (150, 160, 180, 255)
+
         # Top-left corner
         draw.rectangle([50, 50, 50+corner_size, 50+corner_size], fill=corner_color)
         # Top-right corner
@@ -271,4 +411,6 @@ class ImageGenerator:
         # Bottom-left corner
         draw.rectangle([50, height-50-corner_size, 50+corner_size, height-50], fill=corner_color)
         # Bottom-right corner
-        draw.rectangle([width-50-corner_size, height-50-corner_size, width-50, height-50], fill=corner_color)
\ No newline at end of file
+        draw.rectangle([width-50-corner_size, height-50-corner_size, width-50, height-50], fill=corner_color)
+
+        return overlay
\ No newline at end of file
@@ -8,10 +8,11 @@ import os
 import sys
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Dict
 
-from config import Config
+from config import get_config
 from story_generator import StoryGenerator
 from image_generator import ImageGenerator
 from twitter_poster import TwitterPoster
@@ -27,12 +28,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Compiled once; used on every long story that gets threaded
+_HASHTAG_TAIL_RE = re.compile(r'(\s+#\w+(?:\s+#\w+)*)\s*$')
+# Sentence boundary: whitespace after terminal punctuation and before a
+# capital, so abbreviations, decimals and domains are never split
+_SENT_BREAK_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+def _iter_sentences(story: str):
+    """Yield stripped sentences one at a time without building a list."""
+    last_end = 0
+    for match in _SENT_BREAK_RE.finditer(story):
+        sentence = story[last_end:match.start()].strip()
+        if sentence:
+            yield sentence
+        last_end = match.end()
+
+    # Last sentence (or the whole story when it never matched a break)
+    tail = story[last_end:].strip()
+    if tail:
+        yield tail
+
 
 class TweetGenerator:
     """Main class for generating and posting story tweets."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.story_gen = StoryGenerator(self.config)
         self.image_gen = ImageGenerator(self.config)
         self.twitter = TwitterPoster(self.config)
@@ -45,15 +67,17 @@ class TweetGenerator:
             # Generate story on random topic
             story = self.story_gen.generate_story()
             logger.info(f"Generated story: {story[:50]}...")
-            
-            # Generate image based on the story
-            image_path = self.image_gen.generate_image(story, f"story_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+            # Generate image based on the story (one datetime.now() shared
+            # by the filename and the timestamp)
+            now = datetime.now()
+            image_path = self.image_gen.generate_image(story, f"story_{now.strftime('%Y%m%d_%H%M%S')}")
             logger.info(f"Generated image: {image_path}")
-            
+
             post = {
                 'story': story,
                 'image_path': image_path,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             }
             
             logger.info("Successfully generated single story post")
@@ -63,34 +87,50 @@ class TweetGenerator:
             logger.error(f"Error generating post: {str(e)}")
             raise
     
+    def _generate_one_post(self, i: int, run_ts: str) -> Dict:
+        """Generate a single post for the daily batch (thread-safe)."""
+        logger.info(f"Generating story post {i+1}/{self.config.posts_per_day}")
+
+        # Generate story on random topic
+        story = self.story_gen.generate_story()
+        logger.info(f"Generated story: {story[:50]}...")
+
+        # Generate image based on the story; the shared run timestamp plus
+        # the post index keeps filenames unique even within one second
+        image_path = self.image_gen.generate_image(story, f"story_{i+1}_{run_ts}")
+        logger.info(f"Generated image: {image_path}")
+
+        return {
+            'story': story,
+            'image_path': image_path,
+            'timestamp': datetime.now().isoformat()
+        }
+
     def generate_daily_posts(self) -> List[Dict]:
-        """Generate multiple posts (for scheduler use)."""
+        """Generate multiple posts (for scheduler use).
+
+        The posts are independent and dominated by API latency, so they
+        are generated concurrently on a small thread pool.
+        """
         posts = []
-        
+
         logger.info("Starting daily story post generation")
-        
-        for i in range(self.config.posts_per_day):
-            try:
-                logger.info(f"Generating story post {i+1}/{self.config.posts_per_day}")
-                
-                # Generate story on random topic
-                story = self.story_gen.generate_story()
-                logger.info(f"Generated story: {story[:50]}...")
-                
-                # Generate image based on the story
-                image_path = self.image_gen.generate_image(story, f"story_{i+1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-                logger.info(f"Generated image: {image_path}")
-                
-                posts.append({
-                    'story': story,
-                    'image_path': image_path,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                logger.error(f"Error generating post {i+1}: {str(e)}")
-                continue
-                
+
+        run_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        max_workers = min(self.config.posts_per_day, 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._generate_one_post, i, run_ts): i
+                for i in range(self.config.posts_per_day)
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    posts.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error generating post {i+1}: {str(e)}")
+
         return posts
     
     def _split_story_into_tweets(self, story: str) -> List[str]:
@@ -100,60 +140,62 @@ class TweetGenerator:
         
         # Find hashtags at the end
         hashtags = ""
-        hashtag_match = re.search(r'(\s+#\w+(?:\s+#\w+)*)\s*$', story)
+        hashtag_match = _HASHTAG_TAIL_RE.search(story)
         if hashtag_match:
             hashtags = hashtag_match.group(1)
             story = story[:hashtag_match.start()].strip()
-        
-        # Improved sentence splitting using regex
-        sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
-        sentences = re.split(sentence_pattern, story)
-        
-        # Clean up sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        # Group sentences into tweets with better logic
+
+        # Group sentences into tweets in a single pass, tracking the
+        # running length as an int and joining once per emitted tweet.
+        # Sentences stream from _iter_sentences with one-sentence
+        # lookahead so the last one (which reserves hashtag space) is
+        # known without materializing the full list
         tweets = []
-        current_tweet = ""
+        current_parts = []
+        current_len = 0
         thread_number_space = 10  # Reserve space for " (X/Y)" numbering
         available_space = self.config.thread_max_length - thread_number_space
-        
-        for sentence in sentences:
+
+        sentence_iter = _iter_sentences(story)
+        next_sentence = next(sentence_iter, None)
+
+        while next_sentence is not None:
+            sentence = next_sentence
+            next_sentence = next(sentence_iter, None)
+
             # For the last tweet, also reserve space for hashtags
-            is_last_sentence = sentence == sentences[-1]
-            hashtag_space = len(hashtags) if is_last_sentence else 0
+            hashtag_space = len(hashtags) if next_sentence is None else 0
             actual_space = available_space - hashtag_space
-            
+
             # Check if adding this sentence would exceed limit
-            if current_tweet:
-                test_tweet = current_tweet + " " + sentence
-            else:
-                test_tweet = sentence
-            
-            if len(test_tweet) <= actual_space:
-                current_tweet = test_tweet
+            separator = 1 if current_parts else 0
+
+            if current_len + separator + len(sentence) <= actual_space:
+                current_parts.append(sentence)
+                current_len += separator + len(sentence)
             else:
                 # If current tweet has content, save it and start new one
-                if current_tweet:
-                    tweets.append(current_tweet.strip())
-                    current_tweet = sentence
+                if current_parts:
+                    tweets.append(' '.join(current_parts))
+                    current_parts = [sentence]
+                    current_len = len(sentence)
                 else:
                     # Single sentence is too long, need to split it
-                    words = sentence.split()
-                    current_tweet = ""
-                    for word in words:
-                        test_with_word = current_tweet + " " + word if current_tweet else word
-                        if len(test_with_word) <= actual_space:
-                            current_tweet = test_with_word
+                    for word in sentence.split():
+                        word_sep = 1 if current_parts else 0
+                        if current_len + word_sep + len(word) <= actual_space:
+                            current_parts.append(word)
+                            current_len += word_sep + len(word)
                         else:
-                            if current_tweet:
-                                tweets.append(current_tweet.strip())
-                            current_tweet = word
-                    # Don't reset current_tweet here as it contains the remaining words
-        
+                            if current_parts:
+                                tweets.append(' '.join(current_parts))
+                            current_parts = [word]
+                            current_len = len(word)
+                    # current_parts keeps the remaining words for the next round
+
         # Add the last tweet if there's content
-        if current_tweet:
-            tweets.append(current_tweet.strip())
+        if current_parts:
+            tweets.append(' '.join(current_parts))
         
         # Add hashtags only to the last tweet
         if tweets and hashtags:
@@ -217,10 +259,12 @@ class TweetGenerator:
                 logger.info(f"Image: {post['image_path']}")
             
             logger.info("=== Story generation completed ===")
-            
+
         except Exception as e:
             logger.error(f"Critical error in main execution: {str(e)}")
             raise
+        finally:
+            self.image_gen.close()
 
 
 if __name__ == "__main__":
@@ -4,10 +4,21 @@ Twitter Meme Reply Bot
 Analyzes a tweet and creates funny/ironic memes to reply with.
 """
 
+import atexit
+import functools
+import hashlib
 import logging
+import queue
+import random
+import re
+import shutil
 import sys
+import threading
 import argparse
 import os
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Optional, Tuple
 import openai
@@ -16,20 +27,202 @@ from PIL import Image, ImageDraw, ImageFont
 import requests
 import json
 
-from config import Config
+# Optional: faster JSON parsing of model responses when available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config import Config, get_config
 from twitter_poster import TwitterPoster
 
-# Set up logging
+# Set up logging. Records go through a queue and are formatted/written on
+# a QueueListener thread, so worker threads never block on log file I/O
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('meme_replies.log'),
+    logging.StreamHandler(sys.stdout)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+# Pass-through formatter on the queue side; without it basicConfig would
+# stamp its default format onto the record before the listener formats it
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('meme_replies.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[_queue_handler]
 )
+
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued records on exit
+
 logger = logging.getLogger(__name__)
 
+# LRU cache of meme concepts keyed by (provider, tweet-text hash); quote
+# chains and trending phrases repeat the exact same tweet text, and a dict
+# hit replaces a full LLM round-trip
+_ANALYSIS_CACHE: OrderedDict = OrderedDict()
+_ANALYSIS_CACHE_MAX = 1024
+
+# On-disk copy of the analysis cache so concept reuse survives restarts;
+# one small JSON file per (provider, tweet-text hash), same layout as the
+# DALL-E image cache in image_generator
+_ANALYSIS_CACHE_DIRNAME = '.analysis_cache'
+
+# Matches a JSON object or array wrapped in a markdown code fence
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*([\[{].*[\]}])\s*```", re.DOTALL)
+
+# Canned concepts used when AI analysis fails; also consulted by
+# MemeGenerator to reuse the first rendered image per concept
+_FALLBACK_MEMES = (
+    {
+        "meme_type": "reaction",
+        "text_top": "ME READING THIS TWEET",
+        "text_bottom": "INTERESTING...",
+        "image_description": "Person sitting at desk with thoughtful expression, rubbing chin while looking at computer screen, modern office background",
+        "reply_text": "This tweet hits different 🤔"
+    },
+    {
+        "meme_type": "agreement",
+        "text_top": "EVERYONE NEEDS TO SEE",
+        "text_bottom": "THIS TWEET",
+        "image_description": "Excited person pointing dramatically at their phone screen, bright background with emphasis rays",
+        "reply_text": "Facts! 💯 Everyone needs to see this"
+    },
+    {
+        "meme_type": "observation",
+        "text_top": "WHEN SOMEONE DROPS",
+        "text_bottom": "PURE WISDOM ON TWITTER",
+        "image_description": "Person with mind-blown expression, hands on head, sparkles and light rays around their head, amazed facial expression",
+        "reply_text": "Mind = blown 🤯 This is pure wisdom right here"
+    },
+)
+
+_FALLBACK_CONCEPT_KEYS = {
+    (meme["text_top"], meme["text_bottom"]): meme["meme_type"]
+    for meme in _FALLBACK_MEMES
+}
+
+
+def _normalize_concept(concept: Dict) -> Dict:
+    """Uppercase the meme texts once at concept-creation time.
+
+    The renderers then use the fields as-is instead of re-normalizing on
+    every render (and on every cache hit).
+    """
+    concept["text_top"] = concept.get("text_top", "").upper()
+    concept["text_bottom"] = concept.get("text_bottom", "").upper()
+    return concept
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_client(api_key: str) -> openai.OpenAI:
+    """One OpenAI client per process.
+
+    Constructing a client builds a fresh httpx pool and re-reads TLS
+    context; sharing it keeps the connection to api.openai.com alive
+    across analysis and DALL-E calls.
+    """
+    return openai.OpenAI(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=1)
+def _gemini_model(api_key: str, model_name: str = 'gemini-1.5-flash') -> genai.GenerativeModel:
+    """One Gemini text model per process; genai.configure runs once."""
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+@functools.lru_cache(maxsize=1)
+def _genai_image_client(api_key: str):
+    """One google-genai image client per process."""
+    from google import genai as google_genai
+    return google_genai.Client(api_key=api_key)
+
+
+def _loads(text: str):
+    """Parse JSON with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _extract_json(text: str):
+    """Parse a model response as JSON, unwrapping a markdown fence if present."""
+    try:
+        return _loads(text)
+    except ValueError:
+        match = _JSON_BLOCK.search(text)
+        if match:
+            return _loads(match.group(1))
+        raise
+
+
+@functools.lru_cache(maxsize=256)
+def _layout_meme_lines(text: str, font, width: int) -> tuple:
+    """Wrap and center meme text, returning ((line, x), ...) tuples.
+
+    Cached because the fallback phrases and common meme texts recur
+    across a bot run; fonts come from the class-level cache, so they are
+    stable keys. Measures each word once and accumulates widths.
+    """
+    max_width = width - (width * 0.1)  # 5% margin each side
+    space_width = font.getlength(' ')
+
+    lines = []
+    current_line = []
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = font.getlength(word)
+        candidate_width = current_width + (space_width if current_line else 0.0) + word_width
+
+        if candidate_width <= max_width:
+            current_line.append(word)
+            current_width = candidate_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_width = word_width
+            else:
+                lines.append(word)
+
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    # Center on advance width (getlength), which skips the full metric
+    # box computation getbbox does
+    return tuple(
+        (line, int(width - font.getlength(line)) // 2)
+        for line in lines
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _render_text_tile(line: str, font, text_color: tuple, stroke_color: tuple,
+                      stroke_width: int) -> Image.Image:
+    """Render one stroked meme line on a tight transparent tile.
+
+    Cached: meme lines repeat across a run (fallback phrases, recurring
+    top/bottom texts), and a hit skips FreeType rasterization entirely —
+    the warm path is a dict lookup plus one paste. Tiles are pasted with
+    themselves as mask and never mutated, so sharing is safe.
+    """
+    bbox = font.getbbox(line)
+    tile = Image.new('RGBA',
+                     (bbox[2] + 2 * stroke_width, bbox[3] + 2 * stroke_width),
+                     (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text((stroke_width, stroke_width), line, font=font,
+                              fill=text_color, stroke_width=stroke_width,
+                              stroke_fill=stroke_color)
+    return tile
+
 
 class TweetAnalyzer:
     """Analyzes tweets and generates meme concepts."""
@@ -42,12 +235,39 @@ class TweetAnalyzer:
         """Initialize AI client."""
         if self.config.ai_provider == "openai":
             openai.api_key = self.config.openai_api_key
+            self._openai_client = _openai_client(self.config.openai_api_key)
         elif self.config.ai_provider == "gemini":
-            genai.configure(api_key=self.config.gemini_api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+            self.gemini_model = _gemini_model(self.config.gemini_api_key)
     
+    def _analysis_cache_file(self, digest: bytes) -> str:
+        """Path of the on-disk cache entry for a tweet-text digest."""
+        cache_dir = os.path.join(self.config.image_output_dir, _ANALYSIS_CACHE_DIRNAME)
+        return os.path.join(cache_dir, f"{self.config.ai_provider}_{digest.hex()}.json")
+
     def analyze_tweet_for_meme(self, tweet_text: str, tweet_author: str) -> Dict:
         """Analyze tweet and generate meme concept."""
+        digest = hashlib.blake2b(tweet_text.encode(), digest_size=16).digest()
+        cache_key = (self.config.ai_provider, digest)
+        cached = _ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(cache_key)
+            logger.info("Reusing cached meme concept for duplicate tweet text")
+            return dict(cached)
+
+        # In-memory miss: the concept may still be on disk from an earlier run
+        cache_file = self._analysis_cache_file(digest)
+        try:
+            with open(cache_file, 'rb') as f:
+                result = _loads(f.read())
+        except (OSError, ValueError):
+            pass
+        else:
+            _ANALYSIS_CACHE[cache_key] = result
+            if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+                _ANALYSIS_CACHE.popitem(last=False)
+            logger.info("Reusing on-disk meme concept for duplicate tweet text")
+            return dict(result)
+
         try:
             prompt = f"""
             Analyze this tweet and create a funny, ironic, or witty meme response concept:
@@ -68,132 +288,262 @@ class TweetAnalyzer:
                 "text_top": "Top text for meme (short, punchy)",
                 "text_bottom": "Bottom text for meme (punchline/reaction)", 
                 "image_description": "Detailed visual description for AI image generation (background scene, characters, mood, style)",
+                "image_prompt_full": "A complete, self-contained prompt for an AI image model: the scene above plus style directions (high quality, well lit, meme composition, expressive, clean background, vibrant colors, no text in the image, space left at top and bottom for overlay)",
                 "reply_text": "Accompanying tweet text (NO hashtags, max 240 chars)"
             }}
-            
+
             Make it clever, relatable, and engaging!
             """
             
             if self.config.ai_provider == "openai":
-                return self._analyze_with_openai(prompt)
+                result = self._analyze_with_openai(prompt)
             else:
-                return self._analyze_with_gemini(prompt)
-                
+                result = self._analyze_with_gemini(prompt)
+            _normalize_concept(result)
+
+            # Only successful AI results are cached; fallbacks stay random.
+            # The parsed dict (not the raw response string) is what gets
+            # persisted, so a disk hit never needs re-parsing
+            _ANALYSIS_CACHE[cache_key] = result
+            if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+                _ANALYSIS_CACHE.popitem(last=False)
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                with open(cache_file, 'w') as f:
+                    json.dump(result, f)
+            except OSError as e:
+                logger.warning(f"Could not persist meme concept cache entry: {e}")
+
+            return dict(result)
+
         except Exception as e:
             logger.error(f"Error analyzing tweet for meme: {str(e)}")
             return self._generate_fallback_meme(tweet_text)
     
-    def _analyze_with_openai(self, prompt: str) -> Dict:
+    def analyze_tweets_batch(self, items: list) -> list:
+        """Analyze several tweets with a single AI request.
+
+        ``items`` is a list of ``(tweet_text, tweet_author)`` pairs. The
+        whole batch shares one chat completion, so the HTTP round-trip and
+        the static prompt instructions are amortized across all tweets.
+        Returns one meme concept per item, in order.
+        """
+        if len(items) == 1:
+            return [self.analyze_tweet_for_meme(items[0][0], items[0][1])]
+
+        try:
+            numbered = json.dumps([
+                {"id": i, "tweet": text, "author": author}
+                for i, (text, author) in enumerate(items)
+            ])
+
+            prompt = f"""
+            Analyze each of these tweets and create a funny, ironic, or witty meme response concept for every one:
+
+            Tweets (JSON): {numbered}
+
+            For each tweet, generate a meme concept that:
+            1. Is humorous and engaging (funny, ironic, or clever)
+            2. Relates to the tweet's meaning/context
+            3. Uses popular meme formats or creates relatable humor
+            4. Is appropriate for social media (no offensive content)
+            5. Supports or playfully contrasts the original post's meaning
+
+            Return a JSON object with a "memes" array holding one object per tweet:
+            {{"memes": [{{
+                "id": "id from the input",
+                "meme_type": "reaction/agreement/irony/observation",
+                "text_top": "Top text for meme (short, punchy)",
+                "text_bottom": "Bottom text for meme (punchline/reaction)",
+                "image_description": "Detailed visual description for AI image generation (background scene, characters, mood, style)",
+                "image_prompt_full": "A complete, self-contained prompt for an AI image model: the scene above plus style directions (high quality, well lit, meme composition, expressive, clean background, vibrant colors, no text in the image, space left at top and bottom for overlay)",
+                "reply_text": "Accompanying tweet text (NO hashtags, max 240 chars)"
+            }}, ...]}}
+
+            Make them clever, relatable, and engaging!
+            """
+
+            # Scale the token budget with the batch size
+            max_tokens = 300 * len(items)
+            if self.config.ai_provider == "openai":
+                results = self._analyze_with_openai(prompt, max_tokens=max_tokens)
+            else:
+                results = self._analyze_with_gemini(prompt, max_tokens=max_tokens)
+
+            # JSON mode returns an object; unwrap the memes array
+            if isinstance(results, dict):
+                results = results.get("memes", [])
+
+            # Dispatch results by id; tolerate ids echoed back as strings
+            by_id = {}
+            for entry in results:
+                try:
+                    by_id[int(entry.get("id"))] = entry
+                except (TypeError, ValueError):
+                    continue
+
+            return [
+                _normalize_concept(by_id[i]) if by_id.get(i)
+                else self._generate_fallback_meme(items[i][0])
+                for i in range(len(items))
+            ]
+
+        except Exception as e:
+            logger.error(f"Error analyzing tweet batch: {str(e)}")
+            return [self._generate_fallback_meme(text) for text, _ in items]
+
+    def _analyze_with_openai(self, prompt: str, max_tokens: int = 300) -> Dict:
         """Analyze with OpenAI."""
         try:
-            client = openai.OpenAI(api_key=self.config.openai_api_key)
-            
-            response = client.chat.completions.create(
+            response = self._openai_client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a witty meme creator who generates clever, funny responses to tweets. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.8,
-                max_tokens=300
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
             )
             
-            result = response.choices[0].message.content.strip()
-            # Try to parse JSON response
-            try:
-                return json.loads(result)
-            except json.JSONDecodeError:
-                # Extract JSON if wrapped in markdown
-                if "```json" in result:
-                    json_start = result.find("```json") + 7
-                    json_end = result.find("```", json_start)
-                    result = result[json_start:json_end].strip()
-                return json.loads(result)
-                
+            return _extract_json(response.choices[0].message.content.strip())
+
         except Exception as e:
             logger.error(f"OpenAI analysis error: {str(e)}")
             raise
     
-    def _analyze_with_gemini(self, prompt: str) -> Dict:
+    def _analyze_with_gemini(self, prompt: str, max_tokens: int = 300) -> Dict:
         """Analyze with Gemini."""
         try:
             response = self.gemini_model.generate_content(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.8,
-                    max_output_tokens=300
+                    max_output_tokens=max_tokens,
+                    response_mime_type="application/json"
                 )
             )
             
-            result = response.text.strip()
-            # Try to parse JSON response
-            try:
-                return json.loads(result)
-            except json.JSONDecodeError:
-                # Extract JSON if wrapped in markdown
-                if "```json" in result:
-                    json_start = result.find("```json") + 7
-                    json_end = result.find("```", json_start)
-                    result = result[json_start:json_end].strip()
-                return json.loads(result)
-                
+            return _extract_json(response.text.strip())
+
         except Exception as e:
             logger.error(f"Gemini analysis error: {str(e)}")
             raise
     
     def _generate_fallback_meme(self, tweet_text: str) -> Dict:
         """Generate fallback meme when AI fails."""
-        fallback_memes = [
-            {
-                "meme_type": "reaction",
-                "text_top": "ME READING THIS TWEET",
-                "text_bottom": "INTERESTING...",
-                "image_description": "Person sitting at desk with thoughtful expression, rubbing chin while looking at computer screen, modern office background",
-                "reply_text": "This tweet hits different 🤔"
-            },
-            {
-                "meme_type": "agreement", 
-                "text_top": "EVERYONE NEEDS TO SEE",
-                "text_bottom": "THIS TWEET",
-                "image_description": "Excited person pointing dramatically at their phone screen, bright background with emphasis rays",
-                "reply_text": "Facts! 💯 Everyone needs to see this"
-            },
-            {
-                "meme_type": "observation",
-                "text_top": "WHEN SOMEONE DROPS",
-                "text_bottom": "PURE WISDOM ON TWITTER",
-                "image_description": "Person with mind-blown expression, hands on head, sparkles and light rays around their head, amazed facial expression",
-                "reply_text": "Mind = blown 🤯 This is pure wisdom right here"
-            }
-        ]
-        
-        import random
-        return random.choice(fallback_memes)
+        return _normalize_concept(dict(random.choice(_FALLBACK_MEMES)))
 
 
 class MemeGenerator:
     """Generates AI-powered meme images based on concepts."""
-    
+
+    # Fonts cached per size at class level; the faces never change, so
+    # re-parsing the TTF from disk for every meme is pure repeat work
+    _FONT_CACHE: Dict[int, ImageFont.ImageFont] = {}
+
     def __init__(self, config: Config):
         self.config = config
         self._setup_ai_client()
-        
+
+        # Rendered fallback-meme images, keyed by meme_type
+        self._fallback_images: Dict[str, str] = {}
+
+        # Built lazily by _get_http on the first image download
+        self._http = None
+
+        # Reusable text-meme canvases, one per worker thread
+        self._canvas_local = threading.local()
+
+    def _get_canvas(self, width: int, height: int, background_color: tuple):
+        """Return a reusable per-thread canvas cleared to the background.
+
+        Re-filling an existing canvas avoids the ~1 MB allocation per
+        render that Image.new would pay in batch mode; thread-local
+        storage keeps concurrent renders from sharing a canvas.
+        """
+        canvas = getattr(self._canvas_local, 'canvas', None)
+        if canvas is None or canvas.size != (width, height):
+            canvas = Image.new('RGB', (width, height), background_color)
+            self._canvas_local.canvas = canvas
+        else:
+            ImageDraw.Draw(canvas).rectangle([0, 0, width, height], fill=background_color)
+        return canvas
+
+    def _get_http(self):
+        """Create the pooled download session on first use.
+
+        Keep-alive lets repeated base-image downloads reuse the TLS
+        connection instead of paying a fresh handshake per meme.
+        """
+        if self._http is None:
+            from requests.adapters import HTTPAdapter, Retry
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(total=3, backoff_factor=0.3,
+                                  status_forcelist=[429, 500, 502, 503, 504])
+            ))
+            self._http = session
+        return self._http
+
+    @classmethod
+    def _get_font(cls, size: int):
+        """Return a cached meme font, trying Arial Black then fallbacks."""
+        font = cls._FONT_CACHE.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", size)
+            except:
+                try:
+                    font = ImageFont.truetype("arial.ttf", size)
+                except:
+                    font = ImageFont.load_default()
+            cls._FONT_CACHE[size] = font
+        return font
+
     def _setup_ai_client(self):
         """Initialize AI client for image generation."""
         if self.config.ai_provider == "openai":
             openai.api_key = self.config.openai_api_key
         elif self.config.ai_provider == "gemini":
             if self.config.gemini_api_key:
-                genai.configure(api_key=self.config.gemini_api_key)
-                # Use the new Google GenAI client for image generation
-                from google import genai as google_genai
-                self.genai_client = google_genai.Client(api_key=self.config.gemini_api_key)
+                # The new Google GenAI client handles image generation;
+                # shared so analyzer + generator don't each build one
+                self.genai_client = _genai_image_client(self.config.gemini_api_key)
         
     def create_meme_image(self, meme_data: Dict, filename_prefix: str) -> str:
-        """Create AI-generated meme image from concept data."""
+        """Create AI-generated meme image from concept data.
+
+        The canned fallback concepts are deterministic, so their first
+        rendered image is cached and reused on later hits instead of
+        re-running the full pipeline.
+        """
+        fallback_type = _FALLBACK_CONCEPT_KEYS.get(
+            (meme_data.get("text_top", ""), meme_data.get("text_bottom", ""))
+        )
+        if fallback_type is not None:
+            cached = self._fallback_images.get(fallback_type)
+            if cached and os.path.exists(cached):
+                logger.info(f"Reusing rendered fallback meme ({fallback_type}): {cached}")
+                return cached
+
+        image_path = self._render_meme_image(meme_data, filename_prefix)
+
+        if fallback_type is not None:
+            self._fallback_images[fallback_type] = image_path
+
+        return image_path
+
+    def _render_meme_image(self, meme_data: Dict, filename_prefix: str) -> str:
+        """Run the full meme image pipeline for a concept."""
         try:
-            # Create detailed prompt for meme image generation
-            image_prompt = self._create_meme_image_prompt(meme_data)
+            # The analyzer asks the LLM for a ready-to-send image prompt;
+            # composing one client-side is only needed for fallback
+            # concepts or models that omit the field
+            image_prompt = meme_data.get("image_prompt_full") or self._create_meme_image_prompt(meme_data)
             logger.info(f"Generating AI meme image: {meme_data.get('meme_type', 'unknown')} type")
             
             # Generate the base image using AI
@@ -250,8 +600,8 @@ class MemeGenerator:
     def _generate_with_dalle(self, prompt: str, filename_prefix: str) -> str:
         """Generate image using DALL-E."""
         try:
-            client = openai.OpenAI(api_key=self.config.openai_api_key)
-            
+            client = _openai_client(self.config.openai_api_key)
+
             response = client.images.generate(
                 model="dall-e-3",
                 prompt=prompt,
@@ -266,12 +616,12 @@ class MemeGenerator:
             filename = f"{filename_prefix}_base_{datetime.now().strftime('%H%M%S')}.png"
             filepath = os.path.join(self.config.image_output_dir, filename)
             
-            response_img = requests.get(image_url, timeout=30)
-            response_img.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                f.write(response_img.content)
-            
+            # Stream straight to disk instead of buffering the whole PNG
+            with self._get_http().get(image_url, timeout=30, stream=True) as response_img:
+                response_img.raise_for_status()
+                with open(filepath, 'wb') as f:
+                    shutil.copyfileobj(response_img.raw, f, length=65536)
+
             return filepath
             
         except Exception as e:
@@ -287,17 +637,20 @@ class MemeGenerator:
                 model="gemini-2.5-flash-image-preview",
                 contents=[prompt],
                 config=types.GenerateContentConfig(
-                    response_modalities=["Text", "Image"]
+                    # Image only: a text part would just be thrown away
+                    # (and billed)
+                    response_modalities=["Image"]
                 )
             )
-            
+
             # Extract the image from response
-            image_data = None
-            for part in response.candidates[0].content.parts:
-                if part.inline_data is not None:
-                    image_data = part.inline_data.data
-                    break
-            
+            image_data = next(
+                (part.inline_data.data
+                 for part in response.candidates[0].content.parts
+                 if part.inline_data is not None),
+                None,
+            )
+
             if not image_data:
                 raise Exception("No image data returned from Gemini")
             
@@ -305,11 +658,12 @@ class MemeGenerator:
             filename = f"{filename_prefix}_base_{datetime.now().strftime('%H%M%S')}.png"
             filepath = os.path.join(self.config.image_output_dir, filename)
             
-            # Convert bytes to PIL Image and save
-            from io import BytesIO
-            image = Image.open(BytesIO(image_data))
-            image.save(filepath, 'PNG')
-            
+            # The API already returns encoded PNG bytes; write them as-is
+            # rather than decoding and re-encoding through PIL. The overlay
+            # step decodes the file once anyway
+            with open(filepath, 'wb') as f:
+                f.write(image_data)
+
             return filepath
             
         except Exception as e:
@@ -321,21 +675,12 @@ class MemeGenerator:
         try:
             # Open the base image
             image = Image.open(base_image_path)
-            draw = ImageDraw.Draw(image)
-            
+
             width, height = image.size
             
-            # Load fonts
-            try:
-                title_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", int(width * 0.08))
-                subtitle_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", int(width * 0.075))
-            except:
-                try:
-                    title_font = ImageFont.truetype("arial.ttf", int(width * 0.08))
-                    subtitle_font = ImageFont.truetype("arial.ttf", int(width * 0.075))
-                except:
-                    title_font = ImageFont.load_default()
-                    subtitle_font = ImageFont.load_default()
+            # Load fonts (cached per size)
+            title_font = self._get_font(int(width * 0.08))
+            subtitle_font = self._get_font(int(width * 0.075))
             
             # Text styling
             text_color = (255, 255, 255)  # White
@@ -345,14 +690,14 @@ class MemeGenerator:
             # Add top text
             if top_text:
                 self._draw_meme_text(
-                    draw, top_text.upper(), title_font, width, int(height * 0.1),
+                    image, top_text, title_font, width, int(height * 0.1),
                     text_color, stroke_color, stroke_width
                 )
-            
+
             # Add bottom text
             if bottom_text:
                 self._draw_meme_text(
-                    draw, bottom_text.upper(), subtitle_font, width, int(height * 0.85),
+                    image, bottom_text, subtitle_font, width, int(height * 0.85),
                     text_color, stroke_color, stroke_width
                 )
             
@@ -360,7 +705,7 @@ class MemeGenerator:
             final_filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             final_filepath = os.path.join(self.config.image_output_dir, final_filename)
             
-            image.save(final_filepath, 'PNG')
+            image.save(final_filepath, 'PNG', optimize=False, compress_level=1)
             
             # Clean up base image
             try:
@@ -374,47 +719,19 @@ class MemeGenerator:
             logger.error(f"Error adding text overlay: {str(e)}")
             raise
     
-    def _draw_meme_text(self, draw, text: str, font, width: int, y_pos: int, 
+    def _draw_meme_text(self, image, text: str, font, width: int, y_pos: int,
                        text_color: tuple, stroke_color: tuple, stroke_width: int):
         """Draw meme text with outline."""
-        # Wrap text if too long
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
-            
-            if text_width <= width - (width * 0.1):  # 5% margin each side
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    lines.append(word)
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        # Draw each line
+        # Wrapping and centering are memoized per (text, font, width).
+        # Each line is rendered stroked (a single C-level pass) on a tile
+        # sized to its bbox and pasted once, so rasterization touches
+        # bbox-sized buffers instead of the full canvas
         line_height = int(width * 0.08)  # Scale line height with image
-        for i, line in enumerate(lines):
-            bbox = draw.textbbox((0, 0), line, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (width - text_width) // 2
+        for i, (line, x) in enumerate(_layout_meme_lines(text, font, width)):
             y = y_pos + (i * line_height)
-            
-            # Draw outline (stroke)
-            for dx in range(-stroke_width, stroke_width + 1):
-                for dy in range(-stroke_width, stroke_width + 1):
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), line, font=font, fill=stroke_color)
-            
-            # Draw main text
-            draw.text((x, y), line, font=font, fill=text_color)
+
+            tile = _render_text_tile(line, font, text_color, stroke_color, stroke_width)
+            image.paste(tile, (x - stroke_width, y - stroke_width), tile)
     
     def _create_text_based_meme(self, meme_data: Dict, filename_prefix: str) -> str:
         """Fallback: create simple text-based meme."""
@@ -422,34 +739,29 @@ class MemeGenerator:
             width, height = 600, 600
             background_color = (100, 100, 100)  # Gray background
             
-            image = Image.new('RGB', (width, height), background_color)
-            draw = ImageDraw.Draw(image)
-            
-            # Load fonts
-            try:
-                title_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", 48)
-                subtitle_font = ImageFont.truetype("/System/Library/Fonts/Arial Black.ttf", 44)
-            except:
-                title_font = ImageFont.load_default()
-                subtitle_font = ImageFont.load_default()
+            image = self._get_canvas(width, height, background_color)
+
+            # Load fonts (cached per size)
+            title_font = self._get_font(48)
+            subtitle_font = self._get_font(44)
             
             text_color = (255, 255, 255)
             stroke_color = (0, 0, 0)
             stroke_width = 3
             
-            # Add texts
-            top_text = meme_data.get("text_top", "").upper()
-            bottom_text = meme_data.get("text_bottom", "").upper()
+            # Add texts (already uppercased at concept-creation time)
+            top_text = meme_data.get("text_top", "")
+            bottom_text = meme_data.get("text_bottom", "")
             
             if top_text:
-                self._draw_meme_text(draw, top_text, title_font, width, 60, text_color, stroke_color, stroke_width)
+                self._draw_meme_text(image, top_text, title_font, width, 60, text_color, stroke_color, stroke_width)
             if bottom_text:
-                self._draw_meme_text(draw, bottom_text, subtitle_font, width, height - 100, text_color, stroke_color, stroke_width)
+                self._draw_meme_text(image, bottom_text, subtitle_font, width, height - 100, text_color, stroke_color, stroke_width)
             
             # Save image
             filename = f"{filename_prefix}_text_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             filepath = os.path.join(self.config.image_output_dir, filename)
-            image.save(filepath, 'PNG')
+            image.save(filepath, 'PNG', optimize=False, compress_level=1)
             
             return filepath
             
@@ -462,7 +774,7 @@ class MemeReplyBot:
     """Main class for the meme reply bot."""
     
     def __init__(self):
-        self.config = Config()
+        self.config = get_config()
         self.twitter = TwitterPoster(self.config)
         self.analyzer = TweetAnalyzer(self.config)
         self.meme_gen = MemeGenerator(self.config)
@@ -501,6 +813,41 @@ class MemeReplyBot:
             logger.error(f"Error retrieving tweet {tweet_id}: {str(e)}")
             return None
     
+    def get_tweets(self, tweet_ids: list) -> Dict[str, Tuple[str, str]]:
+        """Retrieve several tweets with one API call.
+
+        Twitter's v2 endpoint returns up to 100 tweets per request, so
+        batch mode pays one HTTP round-trip instead of one per tweet.
+        Returns ``{tweet_id: (text, author_username)}`` for the tweets
+        that were accessible.
+        """
+        try:
+            tweets = self.twitter.client.get_tweets(
+                ids=tweet_ids,
+                expansions=['author_id'],
+                user_fields=['username']
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving tweets {tweet_ids}: {str(e)}")
+            return {}
+
+        results: Dict[str, Tuple[str, str]] = {}
+        if not tweets.data:
+            logger.error("No tweets found or accessible")
+            return results
+
+        # Build the author map once from the shared includes
+        usernames = {}
+        if hasattr(tweets, 'includes') and tweets.includes and 'users' in tweets.includes:
+            usernames = {user.id: user.username for user in tweets.includes['users']}
+
+        for tweet in tweets.data:
+            author_username = usernames.get(tweet.author_id, "unknown")
+            logger.info(f"Retrieved tweet from @{author_username}: {tweet.text[:50]}...")
+            results[str(tweet.id)] = (tweet.text, author_username)
+
+        return results
+
     def create_meme_reply(self, tweet_id: str, dry_run: bool = False) -> bool:
         """Create and post meme reply to a tweet."""
         try:
@@ -519,39 +866,95 @@ class MemeReplyBot:
             meme_concept = self.analyzer.analyze_tweet_for_meme(tweet_text, author_username)
             logger.info(f"Generated meme concept: {meme_concept.get('meme_type', 'unknown')}")
             
-            # Step 3: Create meme image
-            meme_image_path = self.meme_gen.create_meme_image(
-                meme_concept, 
-                f"meme_reply_{tweet_id}"
-            )
-            
-            # Step 4: Post reply (if not dry run)
-            if dry_run:
-                logger.info("DRY RUN - Would post reply:")
-                logger.info(f"Reply text: {meme_concept.get('reply_text', '')}")
-                logger.info(f"Meme image: {meme_image_path}")
-                logger.info(f"Meme concept: {meme_concept}")
-                return True
-            else:
-                # Post the meme reply
-                reply_tweet_id = self.twitter.post_tweet(
-                    text=meme_concept.get('reply_text', ''),
-                    image_path=meme_image_path,
-                    reply_to_tweet_id=tweet_id
-                )
-                
-                logger.info(f"Successfully posted meme reply with ID: {reply_tweet_id}")
-                return True
-                
+            # Steps 3-4: Create meme image and post reply
+            return self._render_and_post(tweet_id, meme_concept, dry_run)
+
         except Exception as e:
             logger.error(f"Error creating meme reply: {str(e)}")
             return False
-    
-    def run(self, tweet_id: str, dry_run: bool = False):
-        """Main execution method."""
+
+    def _render_and_post(self, tweet_id: str, meme_concept: Dict, dry_run: bool) -> bool:
+        """Render the meme image for a concept and post (or preview) it."""
+        meme_image_path = self.meme_gen.create_meme_image(
+            meme_concept,
+            f"meme_reply_{tweet_id}"
+        )
+
+        if dry_run:
+            logger.info("DRY RUN - Would post reply:")
+            logger.info(f"Reply text: {meme_concept.get('reply_text', '')}")
+            logger.info(f"Meme image: {meme_image_path}")
+            logger.info(f"Meme concept: {meme_concept}")
+            return True
+
+        # Post the meme reply
+        reply_tweet_id = self.twitter.post_tweet(
+            text=meme_concept.get('reply_text', ''),
+            image_path=meme_image_path,
+            reply_to_tweet_id=tweet_id
+        )
+
+        logger.info(f"Successfully posted meme reply with ID: {reply_tweet_id}")
+        return True
+
+    def run_batch(self, tweet_ids: list, dry_run: bool = False, concurrency: int = 4) -> bool:
+        """Create meme replies for several tweets.
+
+        Tweets are fetched with one batched API call and analyzed in one
+        batched AI request; rendering and posting then proceed per tweet,
+        with at most ``concurrency`` tweets in flight at once.
+        """
+        logger.info(f"=== Creating meme replies for {len(tweet_ids)} tweets ===")
+
+        fetched = self.get_tweets(tweet_ids)
+
+        valid = [(tweet_id, fetched[tweet_id]) for tweet_id in tweet_ids if tweet_id in fetched]
+        for tweet_id in tweet_ids:
+            if tweet_id not in fetched:
+                logger.error(f"Failed to retrieve tweet {tweet_id}")
+
+        if not valid:
+            return False
+
+        concepts = self.analyzer.analyze_tweets_batch([data for _, data in valid])
+
+        # Render and post concurrently as well: image generation is
+        # network-bound (DALL-E/Gemini) and the PIL overlay of one tweet
+        # overlaps the API latency of the others
+        def render_one(tweet_id: str, meme_concept: Dict) -> bool:
+            logger.info(f"Generated meme concept for {tweet_id}: {meme_concept.get('meme_type', 'unknown')}")
+            return self._render_and_post(tweet_id, meme_concept, dry_run)
+
+        all_ok = len(valid) == len(tweet_ids)
+        with ThreadPoolExecutor(max_workers=min(len(valid), max(concurrency, 1))) as executor:
+            futures = {
+                executor.submit(render_one, tweet_id, meme_concept): tweet_id
+                for (tweet_id, _), meme_concept in zip(valid, concepts)
+            }
+
+            for future in futures:
+                tweet_id = futures[future]
+                try:
+                    if not future.result():
+                        all_ok = False
+                except Exception as e:
+                    logger.error(f"Error creating meme reply for {tweet_id}: {str(e)}")
+                    all_ok = False
+
+        return all_ok
+
+    def run(self, tweet_ids: list, dry_run: bool = False, concurrency: int = 4):
+        """Main execution method.
+
+        A single id goes through the sequential path; several ids use the
+        batched fetch/analyze/render pipeline.
+        """
         try:
-            success = self.create_meme_reply(tweet_id, dry_run)
-            
+            if len(tweet_ids) == 1:
+                success = self.create_meme_reply(tweet_ids[0], dry_run)
+            else:
+                success = self.run_batch(tweet_ids, dry_run, concurrency)
+
             if success:
                 logger.info("=== Meme reply generation completed successfully ===")
             else:
@@ -566,25 +969,43 @@ class MemeReplyBot:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Twitter Meme Reply Bot")
     parser.add_argument(
-        "tweet_id",
-        help="Twitter status ID to reply to"
+        "tweet_ids",
+        nargs='*',
+        help="Twitter status ID(s) to reply to"
+    )
+    parser.add_argument(
+        "--tweet-ids-file",
+        help="File with one tweet ID per line (for large batches)"
     )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Test mode - generate meme but don't post"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Max tweets rendered/posted in parallel in batch mode"
+    )
     parser.add_argument(
         "--ai-provider",
         choices=["openai", "gemini"],
         default="gemini",
         help="AI provider to use for analysis"
     )
-    
+
     args = parser.parse_args()
-    
+
+    tweet_ids = list(args.tweet_ids)
+    if args.tweet_ids_file:
+        with open(args.tweet_ids_file) as f:
+            tweet_ids.extend(line.strip() for line in f if line.strip())
+    if not tweet_ids:
+        parser.error("No tweet IDs given (positional or --tweet-ids-file)")
+
     # Set AI provider via environment variable
     os.environ['AI_PROVIDER'] = args.ai_provider
-    
+
     bot = MemeReplyBot()
-    bot.run(args.tweet_id, args.dry_run)
\ No newline at end of file
+    bot.run(tweet_ids, args.dry_run, args.concurrency)
\ No newline at end of file
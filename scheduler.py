@@ -3,13 +3,14 @@ Scheduler module for automating daily tweet generation and posting.
 Supports both immediate execution and scheduled runs.
 """
 
+import bisect
+import heapq
 import logging
-import schedule
-import time
 import signal
 import sys
+import threading
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 import json
 import os
 
@@ -24,34 +25,66 @@ class TweetScheduler:
     def __init__(self):
         self.tweet_generator = TweetGenerator()
         self.running = False
-        self.post_history_file = "post_history.json"
-        
+        # One JSON record per line so recording a post is an O(1) append;
+        # the old array format is migrated on first load
+        self.post_history_file = "post_history.jsonl"
+        self._legacy_history_file = "post_history.json"
+        self._appends_since_compact = 0
+        self._stop_event = threading.Event()
+        # Min-heap of (next_run_epoch, post_time) pairs; every job runs
+        # _run_daily_generation and re-arms itself a day later
+        self._jobs = []
+        # post_times parsed once to (hour, minute) ints
+        self._post_hm = [
+            tuple(map(int, post_time.split(':')))
+            for post_time in self.tweet_generator.config.post_times
+        ]
+        # Parsed history cache, invalidated by file mtime so external
+        # edits are still picked up without re-parsing on every tick
+        self._history_cache = None
+        self._history_mtime = -1
+        # (date, slot) pairs with a recorded post; rebuilt with the cache
+        self._posted_slots = set()
+        # Epochs of the cached posts, ascending and parallel to the posts
+        # list, so date-cutoff filters are a bisect plus a slice
+        self._history_epochs = []
+
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
-    
+
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
         logger.info(f"Received signal {signum}. Shutting down gracefully...")
-        self.running = False
-        sys.exit(0)
+        if self.running:
+            # Wake the scheduler loop immediately instead of exiting
+            # mid-handler; run_scheduler sees self.running and stops cleanly
+            self.running = False
+            self._stop_event.set()
+        else:
+            # No scheduler loop to unwind (immediate/history modes), so
+            # exit directly: otherwise an in-flight generation run could
+            # not be interrupted at all
+            sys.exit(0)
     
     def schedule_daily_posts(self):
         """Schedule daily posts at configured times."""
         config = self.tweet_generator.config
-        
+
         logger.info(f"Scheduling story posts twice daily at: {config.post_times}")
-        
+
         # Clear any existing jobs
-        schedule.clear()
-        
-        # Schedule posts at specified times (every 8 hours)
-        for post_time in config.post_times:
-            schedule.every().day.at(post_time).do(self._run_daily_generation)
+        self._jobs = []
+
+        # Schedule posts at specified times; each entry is the epoch of
+        # its next occurrence, today or tomorrow
+        now = datetime.now()
+        for (hour, minute), post_time in zip(self._post_hm, config.post_times):
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            heapq.heappush(self._jobs, (next_run.timestamp(), post_time))
             logger.info(f"Scheduled story post at {post_time} (twice daily)")
-        
-        # Optional: Schedule a test run every hour during development
-        # schedule.every().hour.do(self._run_test_generation)
     
     def _run_daily_generation(self):
         """Run scheduled story generation (twice daily)."""
@@ -99,47 +132,80 @@ class TweetScheduler:
         except Exception as e:
             logger.error(f"Error during test generation: {str(e)}")
     
+    def _load_history(self) -> dict:
+        """Return parsed post history, re-reading only when the file changed."""
+        try:
+            st = os.stat(self.post_history_file)
+        except OSError:
+            self._migrate_legacy_history()
+            try:
+                st = os.stat(self.post_history_file)
+            except OSError:
+                self._posted_slots = set()
+                self._history_epochs = []
+                return {'posts': []}
+
+        if self._history_cache is None or st.st_mtime_ns != self._history_mtime:
+            with open(self.post_history_file, 'r') as f:
+                posts = [json.loads(line) for line in f if line.strip()]
+            # Appends keep the file chronological, but sort anyway so
+            # externally edited files can't break the bisect invariant
+            posts.sort(key=self._posted_epoch)
+            self._history_cache = {'posts': posts}
+            self._history_epochs = [self._posted_epoch(p) for p in posts]
+            self._history_mtime = st.st_mtime_ns
+            self._posted_slots = self._build_slot_index(self._history_cache)
+
+        return self._history_cache
+
+    def _migrate_legacy_history(self):
+        """One-time conversion of the old post_history.json array format."""
+        if not os.path.exists(self._legacy_history_file):
+            return
+        try:
+            with open(self._legacy_history_file, 'r') as f:
+                posts = json.load(f).get('posts', [])
+
+            tmp_file = self.post_history_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                for post in posts:
+                    f.write(json.dumps(post) + '\n')
+            os.replace(tmp_file, self.post_history_file)
+            os.remove(self._legacy_history_file)
+
+            logger.info(f"Migrated {len(posts)} history records to JSONL")
+        except (OSError, ValueError) as e:
+            logger.error(f"Error migrating legacy history: {str(e)}")
+
+    @staticmethod
+    def _build_slot_index(history: dict) -> set:
+        """Index posts by (date, slot) so the slot check is one lookup."""
+        slots = set()
+        for post in history.get('posts', []):
+            try:
+                hour = datetime.fromisoformat(post['timestamp']).hour
+            except (KeyError, ValueError):
+                continue
+            slots.add((post.get('date'), "morning" if hour < 12 else "evening"))
+        return slots
+
     def _already_posted_in_time_slot(self) -> bool:
         """Check if we've already posted in this 12-hour time slot."""
         try:
-            if not os.path.exists(self.post_history_file):
-                return False
-            
-            with open(self.post_history_file, 'r') as f:
-                history = json.load(f)
-            
+            self._load_history()
+
             current_time = datetime.now()
-            current_hour = current_time.hour
-            
-            # Define 12-hour time slots: 0-11 (morning), 12-23 (evening)
-            if 0 <= current_hour < 12:
-                time_slot = "morning"  # 00:00 - 11:59
-            else:
-                time_slot = "evening"  # 12:00 - 23:59
-            
+
+            # 12-hour time slots: 0-11 (morning), 12-23 (evening)
+            time_slot = "morning" if current_time.hour < 12 else "evening"
             today = current_time.strftime('%Y-%m-%d')
-            
-            # Check if we have a post for today in the current time slot
-            for post in history.get('posts', []):
-                post_date = post.get('date')
-                if post_date != today:
-                    continue
-                    
-                post_time = datetime.fromisoformat(post.get('timestamp', ''))
-                post_hour = post_time.hour
-                
-                # Determine which time slot the post was in
-                if 0 <= post_hour < 12:
-                    post_slot = "morning"
-                else:
-                    post_slot = "evening"
-                
-                if post_slot == time_slot:
-                    logger.info(f"Found existing post in {time_slot} slot at {post_time.strftime('%H:%M')}")
-                    return True
-            
+
+            if (today, time_slot) in self._posted_slots:
+                logger.info(f"Found existing post in {time_slot} slot today")
+                return True
+
             return False
-            
+
         except Exception as e:
             logger.error(f"Error checking post history: {str(e)}")
             return False
@@ -147,37 +213,87 @@ class TweetScheduler:
     def _record_post(self, post: dict):
         """Record a post in the history file."""
         try:
-            history = {'posts': []}
-            
-            if os.path.exists(self.post_history_file):
-                with open(self.post_history_file, 'r') as f:
-                    history = json.load(f)
-            
-            # Add new post record
+            history = self._load_history()
+
+            # Add new post record; the epoch field drives cutoff filters
+            # and sorting, the ISO strings stay for display
+            now = datetime.now()
             post_record = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'timestamp': post.get('timestamp', datetime.now().isoformat()),
+                'date': now.strftime('%Y-%m-%d'),
+                'timestamp': post.get('timestamp', now.isoformat()),
                 'story': post.get('story', '')[:100],  # Truncate for storage
                 'image_path': post.get('image_path', ''),
-                'posted_at': datetime.now().isoformat()
+                'posted_at': now.isoformat(),
+                # Full float precision: legacy rows parse their ISO string
+                # to float epochs, and a truncated int appended in the
+                # same second would sort before them and break the sorted
+                # invariant _history_epochs relies on
+                'posted_at_epoch': now.timestamp()
             }
             
             history['posts'].append(post_record)
-            
-            # Keep only last 30 days of history
-            cutoff_date = datetime.now() - timedelta(days=30)
-            history['posts'] = [
-                p for p in history['posts']
-                if datetime.fromisoformat(p['posted_at']) > cutoff_date
-            ]
-            
-            with open(self.post_history_file, 'w') as f:
-                json.dump(history, f, indent=2)
-            
+            self._history_epochs.append(post_record['posted_at_epoch'])
+
+            # O(1) append instead of re-serializing the whole history;
+            # the 30-day cutoff is applied by the amortized compaction
+            with open(self.post_history_file, 'a') as f:
+                f.write(json.dumps(post_record) + '\n')
+
+            # The write is the freshest state; keep the cache and slot
+            # index hot instead of forcing a re-read on the next check
+            self._history_cache = history
+            self._history_mtime = os.stat(self.post_history_file).st_mtime_ns
+            try:
+                hour = datetime.fromisoformat(post_record['timestamp']).hour
+                self._posted_slots.add(
+                    (post_record['date'], "morning" if hour < 12 else "evening")
+                )
+            except ValueError:
+                self._posted_slots = self._build_slot_index(history)
+
+            self._appends_since_compact += 1
+            if self._appends_since_compact >= 50:
+                self._compact_history()
+
             logger.info("Post recorded in history")
-            
+
         except Exception as e:
             logger.error(f"Error recording post: {str(e)}")
+
+    @staticmethod
+    def _posted_epoch(post: dict) -> float:
+        """Epoch seconds of a record; parses the ISO string only for legacy rows."""
+        epoch = post.get('posted_at_epoch')
+        if epoch is not None:
+            return epoch
+        try:
+            return datetime.fromisoformat(post['posted_at']).timestamp()
+        except (KeyError, ValueError):
+            # Malformed record: sort it to the front so compaction
+            # eventually drops it instead of the whole load failing
+            return 0.0
+
+    def _compact_history(self):
+        """Rewrite the history file without entries older than 30 days."""
+        history = self._load_history()
+        cutoff_epoch = (datetime.now() - timedelta(days=30)).timestamp()
+        # Posts are sorted by epoch, so the survivors are one bisect away
+        idx = bisect.bisect_right(self._history_epochs, cutoff_epoch)
+        kept = history['posts'][idx:]
+
+        if idx:
+            tmp_file = self.post_history_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                for post in kept:
+                    f.write(json.dumps(post) + '\n')
+            os.replace(tmp_file, self.post_history_file)
+
+            self._history_cache = {'posts': kept}
+            self._history_epochs = self._history_epochs[idx:]
+            self._history_mtime = os.stat(self.post_history_file).st_mtime_ns
+            self._posted_slots = self._build_slot_index(self._history_cache)
+
+        self._appends_since_compact = 0
     
     def run_scheduler(self):
         """Run the scheduler loop."""
@@ -186,9 +302,25 @@ class TweetScheduler:
         
         try:
             while self.running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-                
+                # Sleep until the next job instead of polling every
+                # minute. The cap guards against wall-clock changes; the
+                # stop event wakes the loop immediately on SIGINT/SIGTERM
+                if not self._jobs:
+                    logger.info("No jobs scheduled; stopping scheduler")
+                    break
+
+                next_epoch, post_time = self._jobs[0]
+                idle = next_epoch - datetime.now().timestamp()
+                if idle > 0:
+                    if self._stop_event.wait(timeout=min(idle, 3600)):
+                        break
+                    continue  # re-check the deadline after a capped sleep
+
+                # Re-arm for tomorrow before running so a slow or failing
+                # job can't drop its slot
+                heapq.heapreplace(self._jobs, (next_epoch + 86400, post_time))
+                self._run_daily_generation()
+
         except KeyboardInterrupt:
             logger.info("Scheduler stopped by user")
         except Exception as e:
@@ -226,28 +358,25 @@ class TweetScheduler:
             logger.error(f"Error during immediate generation: {str(e)}")
             raise
     
-    def get_post_history(self, days: int = 7) -> List[dict]:
-        """Get post history for the last N days."""
+    def get_post_history(self, days: int = 7, limit: Optional[int] = None) -> List[dict]:
+        """Get post history for the last N days, most recent first.
+
+        With ``limit`` set, only the newest ``limit`` posts are returned.
+        """
         try:
-            if not os.path.exists(self.post_history_file):
-                return []
-            
-            with open(self.post_history_file, 'r') as f:
-                history = json.load(f)
-            
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            recent_posts = [
-                post for post in history.get('posts', [])
-                if datetime.fromisoformat(post['posted_at']) > cutoff_date
-            ]
-            
-            # Sort by timestamp, most recent first
-            recent_posts.sort(
-                key=lambda x: datetime.fromisoformat(x['posted_at']),
-                reverse=True
-            )
-            
+            history = self._load_history()
+
+            cutoff_epoch = (datetime.now() - timedelta(days=days)).timestamp()
+
+            # The cached posts are sorted by epoch, so the cutoff is a
+            # bisect on the parallel epochs list instead of a linear
+            # filter, and "most recent first" is a reversed slice
+            idx = bisect.bisect_right(self._history_epochs, cutoff_epoch)
+            recent_posts = history.get('posts', [])[idx:][::-1]
+
+            if limit is not None:
+                return recent_posts[:limit]
+
             return recent_posts
             
         except Exception as e:
@@ -256,34 +385,66 @@ class TweetScheduler:
 
 
 if __name__ == "__main__":
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="IgnorantStrength Tweet Scheduler")
-    parser.add_argument(
-        '--mode',
-        choices=['schedule', 'immediate', 'history'],
-        default='immediate',
-        help='Operation mode: schedule (run scheduler), immediate (run once), history (show recent posts)'
-    )
-    parser.add_argument(
-        '--days',
-        type=int,
-        default=7,
-        help='Number of days of history to show (for history mode)'
-    )
-    
-    args = parser.parse_args()
-    
+    # The CLI is two optional flags, so parse sys.argv directly and only
+    # build (and pay the import of) an argparse parser for --help
+    argv = sys.argv[1:]
+
+    if '--help' in argv or '-h' in argv:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="IgnorantStrength Tweet Scheduler")
+        parser.add_argument(
+            '--mode',
+            choices=['schedule', 'immediate', 'history'],
+            default='immediate',
+            help='Operation mode: schedule (run scheduler), immediate (run once), history (show recent posts)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Number of days of history to show (for history mode)'
+        )
+        parser.parse_args(argv)
+        sys.exit(0)
+
+    mode = 'immediate'
+    days = 7
+    i = 0
+    while i < len(argv):
+        # Accept both "--flag value" and "--flag=value"; anything else
+        # is an error rather than silently falling through to defaults
+        flag, eq, value = argv[i].partition('=')
+        if flag not in ('--mode', '--days'):
+            sys.exit(f"Unknown argument: {argv[i]} (see --help)")
+        if not eq:
+            if i + 1 >= len(argv):
+                sys.exit(f"Missing value for {flag} (see --help)")
+            i += 1
+            value = argv[i]
+        if flag == '--mode':
+            mode = value
+        else:
+            try:
+                days = int(value)
+            except ValueError:
+                sys.exit(f"--days expects an integer, got {value!r}")
+        i += 1
+
+    if mode not in ('schedule', 'immediate', 'history'):
+        sys.exit(f"Unknown mode: {mode} (expected schedule, immediate or history)")
+
     scheduler = TweetScheduler()
-    
-    if args.mode == 'schedule':
+
+    if mode == 'schedule':
         scheduler.schedule_daily_posts()
         scheduler.run_scheduler()
-    elif args.mode == 'immediate':
+    elif mode == 'immediate':
         scheduler.run_immediate()
-    elif args.mode == 'history':
-        history = scheduler.get_post_history(args.days)
-        print(f"\nPost history for last {args.days} days:")
+    elif mode == 'history':
+        # Cap the printout; a long-lived history can span hundreds of posts
+        history = scheduler.get_post_history(days, limit=50)
+        print(f"\nPost history for last {days} days:")
         print("=" * 50)
         for post in history:
             print(f"Date: {post['date']}")
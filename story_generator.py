@@ -3,35 +3,69 @@ Story generation module supporting both OpenAI and Gemini models.
 Generates short, creative stories on random topics.
 """
 
+import functools
+import io
+import json
 import logging
 import random
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional
-import openai
-import google.generativeai as genai
+
+# openai / google.generativeai are imported lazily in the provider
+# branches: each pulls in a large dependency tree (httpx, protobuf, ...)
+# and only one provider is active per run
 
 logger = logging.getLogger(__name__)
 
+# Pending OpenAI Batch API job ids, persisted between runs
+_BATCH_TRACK_FILE = "story_batches.json"
+
+# Trailing hashtag block, e.g. " #TinyTales #Fantasy"
+_HASHTAG_TAIL_RE = re.compile(r'(\s*#\S+(?:\s+#\S+)*)\s*$')
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_client(api_key: str) -> "openai.OpenAI":
+    """One OpenAI client per process so its httpx pool is reused."""
+    import openai
+
+    return openai.OpenAI(api_key=api_key)
+
 
 class StoryGenerator:
     """Generates short stories using AI models on random topics."""
-    
+
+    # Shared across instances; a tuple so it is never rebuilt or mutated
+    fallback_stories = (
+        "She opened the old music box. Instead of a ballerina, a tiny dragon emerged, yawned, and asked for coffee. 'Mondays,' it muttered. #TinyTales #Fantasy #MondayMood",
+        "The last library on Earth had one visitor daily - a robot learning to read bedtime stories to mechanical children. #SciFi #Hope #Books",
+        "He found a vending machine selling 'Lost Memories' for $1.50. His childhood summers cost extra. #Memory #Mystery #Life",
+        "The time traveler's biggest problem wasn't paradoxes - it was remembering which century required which social media platform. #TimeTravel #Comedy #SocialMedia",
+        "Every night at 3 AM, the houseplants gossiped about their owners. Tonight, they planned an intervention. #Plants #Humor #Mystery"
+    )
+
     def __init__(self, config):
         self.config = config
-        self.fallback_stories = [
-            "She opened the old music box. Instead of a ballerina, a tiny dragon emerged, yawned, and asked for coffee. 'Mondays,' it muttered. #TinyTales #Fantasy #MondayMood",
-            "The last library on Earth had one visitor daily - a robot learning to read bedtime stories to mechanical children. #SciFi #Hope #Books",
-            "He found a vending machine selling 'Lost Memories' for $1.50. His childhood summers cost extra. #Memory #Mystery #Life",
-            "The time traveler's biggest problem wasn't paradoxes - it was remembering which century required which social media platform. #TimeTravel #Comedy #SocialMedia",
-            "Every night at 3 AM, the houseplants gossiped about their owners. Tonight, they planned an intervention. #Plants #Humor #Mystery"
-        ]
-        
+        self._rng = random.Random()
+        # Stories already generated for a (provider, prompt) pair; only
+        # consulted when deterministic caching is enabled (see
+        # generate_story)
+        self._story_cache = {}
         self._setup_ai_client()
     
     def _setup_ai_client(self):
         """Initialize the AI client based on the configured provider."""
         if self.config.ai_provider == "openai":
+            import openai
+
             openai.api_key = self.config.openai_api_key
+            # Built once (and shared process-wide) so HTTP keep-alive
+            # works across generations instead of re-doing TCP+TLS setup
+            self.openai_client = _openai_client(self.config.openai_api_key)
         elif self.config.ai_provider == "gemini":
+            import google.generativeai as genai
+
             genai.configure(api_key=self.config.gemini_api_key)
             # Use the story_model from config (allows switching between versions)
             if 'gemini-2.5-flash' in self.config.story_model:
@@ -49,47 +83,80 @@ class StoryGenerator:
     
     def generate_story(self) -> str:
         """Generate a story using the configured AI provider."""
+        # At temperature 0 an identical prompt deterministically yields
+        # the same story, so a repeat is a wasted API round-trip. The
+        # cache is opt-in (story_cache_enabled) and never used at
+        # creative temperatures, where it would hurt output diversity.
+        prompt = self.config.story_prompt_template
+        cacheable = self.config.story_cache_enabled and self.config.story_temperature == 0
+        if cacheable:
+            cached = self._story_cache.get((self.config.ai_provider, prompt))
+            if cached is not None:
+                logger.info("Reusing cached story for identical deterministic prompt")
+                return cached
+
         try:
             if self.config.ai_provider == "openai":
-                return self._generate_with_openai()
+                story = self._generate_with_openai(prompt=prompt)[0]
             elif self.config.ai_provider == "gemini":
-                return self._generate_with_gemini()
+                story = self._generate_with_gemini(prompt=prompt)
+            else:
+                raise ValueError(f"Unsupported AI provider: {self.config.ai_provider}")
+            if cacheable:
+                self._story_cache[(self.config.ai_provider, prompt)] = story
+            return story
         except Exception as e:
             logger.error(f"Error generating story with {self.config.ai_provider}: {str(e)}")
             logger.info("Falling back to random pre-written story")
-            return random.choice(self.fallback_stories)
+            return self._rng.choice(self.fallback_stories)
     
-    def _generate_with_openai(self) -> str:
-        """Generate story using OpenAI API."""
+    def _generate_with_openai(self, n: int = 1, prompt: Optional[str] = None) -> List[str]:
+        """Generate ``n`` stories with one OpenAI request.
+
+        All ``n`` completions are sampled from a single multi-completion
+        request, so the request overhead and system prompt are paid once
+        per batch. Always returns a list, even for ``n == 1``.
+        """
+        if prompt is None:
+            prompt = self.config.story_prompt_template
         try:
-            client = openai.OpenAI(api_key=self.config.openai_api_key)
-            
-            response = client.chat.completions.create(
+            response = self.openai_client.chat.completions.create(
                 model=self.config.story_model,
                 messages=[
                     {"role": "system", "content": "You are a creative storyteller who writes engaging, concise stories that capture readers' imagination in just a few sentences. Your stories are diverse, ranging from fantasy to slice-of-life, humor to mystery."},
-                    {"role": "user", "content": self.config.story_prompt_template}
+                    {"role": "user", "content": prompt}
                 ],
                 temperature=self.config.story_temperature,
-                max_tokens=250
+                max_tokens=250,
+                n=n
             )
-            
-            story = response.choices[0].message.content.strip()
-            
-            # Validate story length
-            if len(story) > self.config.story_max_length:
-                story = self._truncate_story(story)
-            
-            logger.info(f"Generated story with OpenAI: {story[:50]}...")
-            return story
-            
+
+            stories = []
+            for choice in response.choices:
+                story = choice.message.content.strip()
+
+                # Validate story length
+                if len(story) > self.config.story_max_length:
+                    story = self._truncate_story(story)
+                stories.append(story)
+
+            if n == 1:
+                logger.info(f"Generated story with OpenAI: {stories[0][:50]}...")
+            else:
+                logger.info(f"Generated {len(stories)} stories with a single OpenAI request")
+            return stories
+
         except Exception as e:
             logger.error(f"OpenAI API error: {str(e)}")
             raise
     
-    def _generate_with_gemini(self) -> str:
+    def _generate_with_gemini(self, prompt: Optional[str] = None) -> str:
         """Generate story using Gemini API."""
+        if prompt is None:
+            prompt = self.config.story_prompt_template
         try:
+            import google.generativeai as genai
+
             # Configure safety settings to be more permissive for creative writing
             safety_settings = [
                 {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -99,7 +166,7 @@ class StoryGenerator:
             ]
             
             response = self.gemini_model.generate_content(
-                self.config.story_prompt_template,
+                prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=self.config.story_temperature,
                     max_output_tokens=250
@@ -142,34 +209,182 @@ class StoryGenerator:
         """Truncate story to fit within character limit while preserving hashtags."""
         if len(story) <= self.config.story_max_length:
             return story
-        
-        # Try to preserve hashtags at the end
-        hashtag_start = story.rfind('#')
-        if hashtag_start != -1:
-            main_story = story[:hashtag_start].strip()
-            hashtags = story[hashtag_start:]
-            
+
+        # Try to preserve the trailing hashtag block, located with one
+        # anchored regex pass instead of rfind plus substring slicing
+        hashtag_match = _HASHTAG_TAIL_RE.search(story)
+        if hashtag_match:
+            main_story = story[:hashtag_match.start()].rstrip()
+            hashtags = hashtag_match.group(1).strip()
+
             # Calculate available space for main story
             available_length = self.config.story_max_length - len(hashtags) - 1  # -1 for space
-            
+
             if available_length > 100:  # Ensure minimum story length
-                truncated_main = main_story[:available_length].rsplit(' ', 1)[0]  # Cut at word boundary
-                return f"{truncated_main} {hashtags}"
-        
+                if len(main_story) > available_length:
+                    # Cut at word boundary; the bounded rfind scans only
+                    # the prefix instead of slicing and rsplitting it
+                    cut = main_story.rfind(' ', 0, available_length)
+                    main_story = main_story[:cut] if cut != -1 else main_story[:available_length]
+                return f"{main_story} {hashtags}"
+
         # Fallback: simple truncation at word boundary
-        truncated = story[:self.config.story_max_length].rsplit(' ', 1)[0]
+        cut = story.rfind(' ', 0, self.config.story_max_length)
+        truncated = story[:cut] if cut != -1 else story[:self.config.story_max_length]
         return truncated + "..."
     
     def generate_batch_stories(self, count: int = 3) -> List[str]:
-        """Generate multiple stories for batch processing."""
-        stories = []
+        """Generate multiple stories for batch processing.
+
+        With OpenAI the whole batch is sampled from one multi-completion
+        request (``n=count``), paying the request overhead and system
+        prompt once. Gemini has no equivalent parameter, so its calls
+        (and any failed OpenAI batch) run concurrently on a small thread
+        pool instead of back to back.
+        """
+        if self.config.ai_provider == "openai":
+            try:
+                stories = self._generate_with_openai(n=count)
+                # Pad if the API returned fewer choices than requested
+                while len(stories) < count:
+                    stories.append(self._rng.choice(self.fallback_stories))
+                return stories
+            except Exception as e:
+                logger.error(f"Batch story request failed, retrying individually: {str(e)}")
+
+        stories: List[Optional[str]] = [None] * count
+
+        # Pre-sample a pool of distinct fallbacks so failure handling in
+        # the workers is a pop instead of a fresh RNG call per error
+        fallback_pool = self._rng.sample(
+            self.fallback_stories, min(count, len(self.fallback_stories))
+        )
+
+        max_workers = min(count, 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.generate_story): i
+                for i in range(count)
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    stories[i] = future.result()
+                    logger.info(f"Generated story {i+1}/{count}")
+                except Exception as e:
+                    logger.error(f"Error generating story {i+1}: {str(e)}")
+                    if fallback_pool:
+                        stories[i] = fallback_pool.pop()
+                    else:
+                        stories[i] = self._rng.choice(self.fallback_stories)
+
+        return stories
+
+    def _load_pending_batches(self) -> List[str]:
+        """Read the list of submitted-but-uncollected batch ids."""
+        try:
+            with open(_BATCH_TRACK_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_pending_batches(self, batch_ids: List[str]) -> None:
+        with open(_BATCH_TRACK_FILE, 'w') as f:
+            json.dump(batch_ids, f)
+
+    def submit_story_batch(self, count: int = 3) -> str:
+        """Submit an OpenAI Batch API job for offline story generation.
+
+        Batch requests are billed at half the synchronous price; results
+        arrive within 24 hours and are collected by poll_story_batches().
+        Only supported for the openai provider.
+        """
+        if self.config.ai_provider != "openai":
+            raise ValueError("Batch story generation requires the openai provider")
+
+        client = self.openai_client
+
+        lines = []
         for i in range(count):
+            lines.append(json.dumps({
+                "custom_id": f"story-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.config.story_model,
+                    "messages": [
+                        {"role": "system", "content": "You are a creative storyteller who writes engaging, concise stories that capture readers' imagination in just a few sentences. Your stories are diverse, ranging from fantasy to slice-of-life, humor to mystery."},
+                        {"role": "user", "content": self.config.story_prompt_template}
+                    ],
+                    "temperature": self.config.story_temperature,
+                    "max_tokens": 250
+                }
+            }))
+
+        input_file = client.files.create(
+            file=io.BytesIO('\n'.join(lines).encode()),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        pending = self._load_pending_batches()
+        pending.append(batch.id)
+        self._save_pending_batches(pending)
+
+        logger.info(f"Submitted story batch {batch.id} with {count} requests")
+        return batch.id
+
+    def poll_story_batches(self) -> List[str]:
+        """Collect stories from completed batch jobs.
+
+        Finished jobs are removed from the tracking file; jobs still in
+        progress stay pending for the next poll. Returns the stories
+        gathered this round (possibly empty).
+        """
+        pending = self._load_pending_batches()
+        if not pending:
+            return []
+
+        client = _openai_client(self.config.openai_api_key)
+        stories = []
+        still_pending = []
+
+        for batch_id in pending:
             try:
-                story = self.generate_story()
-                stories.append(story)
-                logger.info(f"Generated story {i+1}/{count}")
+                batch = client.batches.retrieve(batch_id)
             except Exception as e:
-                logger.error(f"Error generating story {i+1}: {str(e)}")
-                stories.append(random.choice(self.fallback_stories))
-        
+                logger.error(f"Error checking batch {batch_id}: {str(e)}")
+                still_pending.append(batch_id)
+                continue
+
+            if batch.status in ("validating", "in_progress", "finalizing"):
+                still_pending.append(batch_id)
+                continue
+
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.warning(f"Batch {batch_id} ended with status {batch.status}; dropping it")
+                continue
+
+            output = client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    story = record["response"]["body"]["choices"][0]["message"]["content"].strip()
+                except (ValueError, KeyError, IndexError) as e:
+                    logger.error(f"Malformed batch output line in {batch_id}: {str(e)}")
+                    continue
+                if len(story) > self.config.story_max_length:
+                    story = self._truncate_story(story)
+                stories.append(story)
+
+            logger.info(f"Collected {len(stories)} stories from batch {batch_id}")
+
+        self._save_pending_batches(still_pending)
         return stories
\ No newline at end of file
@@ -5,7 +5,8 @@ Test script for meme reply bot functionality.
 
 import os
 import sys
-from config import Config
+from concurrent.futures import ThreadPoolExecutor
+from config import get_config
 from meme_reply_bot import TweetAnalyzer, MemeGenerator
 
 def test_meme_generation():
@@ -15,7 +16,7 @@ def test_meme_generation():
     os.environ['AI_PROVIDER'] = 'gemini'
     os.environ['AUTO_POST'] = 'false'
     
-    config = Config()
+    config = get_config()
     
     # Test tweet examples
     test_tweets = [
@@ -43,28 +44,43 @@ def test_meme_generation():
     # Test analyzer
     analyzer = TweetAnalyzer(config)
     meme_gen = MemeGenerator(config)
-    
-    for i, tweet in enumerate(test_tweets, 1):
-        print(f"\n--- Test {i} ---")
-        print(f"Original Tweet: {tweet['text']}")
-        print(f"Author: @{tweet['author']}")
-        
+
+    def process_one(i, tweet):
+        """Analyze and render one test tweet; returns its report block."""
+        lines = [
+            f"\n--- Test {i} ---",
+            f"Original Tweet: {tweet['text']}",
+            f"Author: @{tweet['author']}",
+        ]
+
         try:
             # Analyze tweet
             meme_concept = analyzer.analyze_tweet_for_meme(tweet['text'], tweet['author'])
-            
-            print(f"Meme Type: {meme_concept.get('meme_type', 'N/A')}")
-            print(f"Top Text: {meme_concept.get('text_top', 'N/A')}")
-            print(f"Bottom Text: {meme_concept.get('text_bottom', 'N/A')}")
-            print(f"Reply Text: {meme_concept.get('reply_text', 'N/A')}")
-            
+
+            lines.append(f"Meme Type: {meme_concept.get('meme_type', 'N/A')}")
+            lines.append(f"Top Text: {meme_concept.get('text_top', 'N/A')}")
+            lines.append(f"Bottom Text: {meme_concept.get('text_bottom', 'N/A')}")
+            lines.append(f"Reply Text: {meme_concept.get('reply_text', 'N/A')}")
+
             # Generate meme image
             image_path = meme_gen.create_meme_image(meme_concept, f"test_meme_{i}")
-            print(f"Generated Image: {image_path}")
-            
+            lines.append(f"Generated Image: {image_path}")
+
         except Exception as e:
-            print(f"Error: {e}")
-    
+            lines.append(f"Error: {e}")
+
+        return '\n'.join(lines)
+
+    # The tests are independent API round-trips, so run them in parallel
+    # and print the collected reports in order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(process_one, i, tweet)
+            for i, tweet in enumerate(test_tweets, 1)
+        ]
+        for future in futures:
+            print(future.result())
+
     print("\n" + "=" * 50)
     print("Meme generation test completed!")
 
@@ -6,7 +6,10 @@ Handles authentication and media uploads.
 import logging
 import os
 from typing import Optional
-import tweepy
+
+# tweepy is imported lazily in _setup_twitter_clients: with auto_post
+# disabled (the default) the clients are never built, so dry runs skip
+# the import entirely
 
 logger = logging.getLogger(__name__)
 
@@ -18,85 +21,88 @@ class TwitterPoster:
         self.config = config
         self.api = None
         self.client = None
+        # Uploaded media ids keyed by (abspath, mtime_ns) so the same
+        # image is never uploaded twice (e.g. a thread cover image)
+        self._media_cache = {}
         
         if self.config.auto_post:
             self._setup_twitter_clients()
     
+    def _build_oauth1_api(self):
+        """Build the OAuth 1.0a API used for media uploads."""
+        import tweepy
+
+        auth = tweepy.OAuth1UserHandler(
+            consumer_key=self.config.twitter_api_key,
+            consumer_secret=self.config.twitter_api_secret,
+            access_token=self.config.twitter_access_token,
+            access_token_secret=self.config.twitter_access_token_secret
+        )
+        return tweepy.API(auth)
+
+    def _build_v2_client(self):
+        """Build the API v2 client used for posting tweets."""
+        import tweepy
+
+        return tweepy.Client(
+            bearer_token=self.config.twitter_bearer_token,
+            consumer_key=self.config.twitter_api_key,
+            consumer_secret=self.config.twitter_api_secret,
+            access_token=self.config.twitter_access_token,
+            access_token_secret=self.config.twitter_access_token_secret,
+            wait_on_rate_limit=True
+        )
+
     def _setup_twitter_clients(self):
         """Initialize Twitter API clients."""
         try:
+            has_oauth1 = bool(
+                self.config.twitter_api_key and self.config.twitter_api_secret and
+                self.config.twitter_access_token and self.config.twitter_access_token_secret
+            )
+
             # Try OAuth 2.0 first (Client ID/Secret)
             if self.config.twitter_client_id and self.config.twitter_client_secret:
                 logger.info("Attempting OAuth 2.0 setup with Client ID/Secret")
-                self.client = tweepy.Client(
-                    bearer_token=self.config.twitter_bearer_token,
-                    consumer_key=self.config.twitter_api_key,
-                    consumer_secret=self.config.twitter_api_secret,
-                    access_token=self.config.twitter_access_token,
-                    access_token_secret=self.config.twitter_access_token_secret,
-                    wait_on_rate_limit=True
-                )
-                
+                self.client = self._build_v2_client()
+
                 # For media upload, we still need OAuth 1.0a API
-                if (self.config.twitter_api_key and self.config.twitter_api_secret and 
-                    self.config.twitter_access_token and self.config.twitter_access_token_secret):
-                    auth = tweepy.OAuth1UserHandler(
-                        consumer_key=self.config.twitter_api_key,
-                        consumer_secret=self.config.twitter_api_secret,
-                        access_token=self.config.twitter_access_token,
-                        access_token_secret=self.config.twitter_access_token_secret
-                    )
-                    self.api = tweepy.API(auth)
+                if has_oauth1:
+                    self.api = self._build_oauth1_api()
                     logger.info("Using hybrid OAuth 2.0 + OAuth 1.0a for media upload")
                 else:
                     logger.warning("No OAuth 1.0a credentials - media upload will not work")
                     self.api = None
-                    
+
             # Fallback to OAuth 1.0a only
-            elif (self.config.twitter_api_key and self.config.twitter_api_secret and 
-                  self.config.twitter_access_token and self.config.twitter_access_token_secret):
+            elif has_oauth1:
                 logger.info("Using OAuth 1.0a authentication")
-                auth = tweepy.OAuth1UserHandler(
-                    consumer_key=self.config.twitter_api_key,
-                    consumer_secret=self.config.twitter_api_secret,
-                    access_token=self.config.twitter_access_token,
-                    access_token_secret=self.config.twitter_access_token_secret
-                )
-                self.api = tweepy.API(auth)
-                
-                self.client = tweepy.Client(
-                    bearer_token=self.config.twitter_bearer_token,
-                    consumer_key=self.config.twitter_api_key,
-                    consumer_secret=self.config.twitter_api_secret,
-                    access_token=self.config.twitter_access_token,
-                    access_token_secret=self.config.twitter_access_token_secret,
-                    wait_on_rate_limit=True
-                )
+                self.api = self._build_oauth1_api()
+                self.client = self._build_v2_client()
             else:
                 raise ValueError("No valid Twitter authentication credentials provided")
-            
+
             # Test authentication
             self._test_authentication()
-            
+
             logger.info("Twitter API clients initialized successfully")
-            
+
         except Exception as e:
             logger.error(f"Failed to initialize Twitter API clients: {str(e)}")
             raise
-    
+
     def _test_authentication(self):
         """Test Twitter API authentication."""
         try:
-            # Test API v2 first (more reliable)
+            # One round-trip is enough: v2 is what posting uses, so test
+            # it when available and only fall back to the v1.1 check
             if self.client:
                 me = self.client.get_me()
                 logger.info(f"Authenticated as: @{me.data.username}")
-            
-            # Test API v1.1 if available
-            if self.api:
+            elif self.api:
                 self.api.verify_credentials()
                 logger.info("OAuth 1.0a API verified successfully")
-            
+
         except Exception as e:
             logger.error(f"Twitter authentication failed: {str(e)}")
             raise
@@ -147,25 +153,48 @@ class TwitterPoster:
     def _upload_media(self, image_path: str) -> str:
         """Upload media file to Twitter."""
         try:
-            if not os.path.exists(image_path):
+            try:
+                file_stat = os.stat(image_path)
+            except OSError:
                 raise FileNotFoundError(f"Image file not found: {image_path}")
-            
+
+            cache_key = (os.path.abspath(image_path), file_stat.st_mtime_ns)
+            cached_id = self._media_cache.get(cache_key)
+            if cached_id:
+                logger.info(f"Reusing uploaded media for: {image_path}")
+                return cached_id
+
             # Check file size (Twitter limit is 5MB for images)
-            file_size = os.path.getsize(image_path)
+            file_size = file_stat.st_size
             max_size = 5 * 1024 * 1024  # 5MB
-            
+
             if file_size > max_size:
-                logger.warning(f"Image file size ({file_size} bytes) exceeds Twitter limit ({max_size} bytes)")
-                # Could implement image compression here if needed
-            
-            media = self.api.media_upload(image_path)
-            
+                logger.warning(f"Image file size ({file_size} bytes) exceeds Twitter limit ({max_size} bytes); recompressing")
+                image_path = self._compress_image(image_path)
+                file_size = os.path.getsize(image_path)
+
+            # Chunked upload streams large files instead of buffering the
+            # whole image in memory before the POST
+            media = self.api.media_upload(image_path, chunked=file_size > 1_000_000)
+            self._media_cache[cache_key] = media.media_id_string
+
             logger.info(f"Successfully uploaded media: {image_path}")
             return media.media_id_string
-            
+
         except Exception as e:
             logger.error(f"Error uploading media: {str(e)}")
             raise
+
+    def _compress_image(self, image_path: str) -> str:
+        """Re-encode an oversized image as JPEG to fit the upload limit."""
+        from PIL import Image
+
+        jpeg_path = os.path.splitext(image_path)[0] + '_upload.jpg'
+        with Image.open(image_path) as image:
+            image.convert('RGB').save(jpeg_path, 'JPEG', quality=85, optimize=True)
+
+        logger.info(f"Recompressed {image_path} to {os.path.getsize(jpeg_path)} bytes")
+        return jpeg_path
     
     def post_thread(self, tweets: list) -> list:
         """Post a thread of tweets."""
@@ -176,16 +205,16 @@ class TwitterPoster:
         reply_to_tweet_id = None
         
         for i, tweet_data in enumerate(tweets):
+            text = tweet_data.get('text', '')
+            image_path = tweet_data.get('image_path')
+
+            # Prepare tweet parameters
+            tweet_params = {"text": text}
+
             try:
-                text = tweet_data.get('text', '')
-                image_path = tweet_data.get('image_path')
-                
                 media_id = None
                 if image_path and os.path.exists(image_path):
                     media_id = self._upload_media(image_path)
-                
-                # Prepare tweet parameters
-                tweet_params = {"text": text}
                 if media_id:
                     tweet_params["media_ids"] = [media_id]
                 if reply_to_tweet_id: